@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+import sys
+import time
+import random
+import tracemalloc
+from process import (Process, RoundRobinScheduler, SJFScheduler, PriorityScheduler,
+                     MultiCoreScheduler, ProcessTable, PIDAllocator)
+from memory import MemoryManager, BuddyAllocator, lru_hit_ratio_curve
+from sync import ProducerConsumer
+from io_devices import IORequest, IORequestType, Printer, DiskScheduler
+from events import EventEngine
+
+def measure(func, repeat=1):
+    """Devuelve el mejor tiempo (en segundos) de varias ejecuciones"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def bench_allocation(frame_counts=(1000, 10000, 100000, 300000), pages=256):
+    """Asignación de memoria y estadísticas con distintos tamaños de memoria"""
+    print("\nAsignación de memoria (%d páginas por proceso)" % pages)
+    print("Marcos  | Asignación (ms) | Estadísticas (us)")
+    print("-" * 45)
+    for frames in frame_counts:
+        memory = MemoryManager(total_frames=frames)
+        # Ocupar la mayor parte de la memoria antes de medir
+        filler = Process("relleno", 1, memory_size=(frames - 2 * pages) * 4, pid=1)
+        memory.allocate_memory(filler)
+
+        process = Process("bench", 1, memory_size=pages * 4, pid=2)
+        alloc_time = measure(lambda: memory.allocate_memory(process))
+        stats_time = measure(memory.get_statistics, repeat=100)
+        print(f"{frames:7d} | {alloc_time * 1000:15.3f} | {stats_time * 1e6:17.3f}")
+
+def make_trace(processes, length, seed=0, locality=0.9):
+    """Genera una traza (pid, page_id) con localidad de referencia"""
+    rng = random.Random(seed)
+    pages = lambda process: (process.memory_size + 3) // 4
+    trace = []
+    process = processes[0]
+    page_id = 0
+    for _ in range(length):
+        if rng.random() < locality:
+            page_id = max(0, min(pages(process) - 1, page_id + rng.randint(-2, 2)))
+        else:
+            process = rng.choice(processes)
+            page_id = rng.randrange(pages(process))
+        trace.append((process.pid, page_id))
+    return trace
+
+def bench_replay(length=1000000, frames=1024):
+    """Reproducción masiva de una traza frente a llamadas individuales"""
+    print("\nReproducción de traza (%d referencias, %d marcos)" % (length, frames))
+
+    def setup():
+        memory = MemoryManager(total_frames=frames)
+        processes = [Process(f"p{i}", 1, memory_size=1024 * 4, pid=i + 1) for i in range(4)]
+        for process in processes:
+            memory.allocate_memory(process)
+        return memory, processes
+
+    memory, processes = setup()
+    trace = make_trace(processes, length)
+    start = time.perf_counter()
+    for pid, page_id in trace:
+        memory.access_page(memory.processes[pid], page_id)
+    loop_time = time.perf_counter() - start
+
+    memory, processes = setup()
+    trace = make_trace(processes, length)
+    start = time.perf_counter()
+    result = memory.replay(trace)
+    replay_time = time.perf_counter() - start
+
+    print(f"access_page en bucle: {loop_time:.3f} s")
+    print(f"replay:               {replay_time:.3f} s (tasa de aciertos {result['hit_ratio']:.3f})")
+
+def bench_hit_ratio_curve(length=200000, sizes=(64, 128, 256, 512, 1024, 2048)):
+    """Curva de aciertos LRU en una pasada frente a un barrido de tamaños"""
+    print("\nCurva de aciertos LRU (%d referencias)" % length)
+    processes = [Process(f"p{i}", 1, memory_size=1024 * 4, pid=i + 1) for i in range(4)]
+    trace = make_trace(processes, length, seed=1)
+
+    start = time.perf_counter()
+    curve = lru_hit_ratio_curve(trace, max(sizes), processes=processes)
+    curve_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for frames in sizes:
+        memory = MemoryManager(total_frames=frames, algorithm="LRU")
+        for process in processes:
+            process.pages, process.page_index = [], {}
+            memory.allocate_memory(process)
+        result = memory.replay(trace)
+        assert result['hit_ratio'] == curve[frames - 1]
+    sweep_time = time.perf_counter() - start
+
+    print(f"Una pasada ({max(sizes)} tamaños): {curve_time:.3f} s")
+    print(f"Barrido ({len(sizes)} tamaños):    {sweep_time:.3f} s")
+
+def bench_fork(workers=200, pages=256, frames=100000):
+    """Creación de procesos clonados: memoria privada frente a fork con copia en escritura"""
+    print("\nCreación de %d procesos clonados (%d páginas cada uno)" % (workers, pages))
+    for mode in ("privada", "fork"):
+        memory = MemoryManager(total_frames=frames)
+        pids = PIDAllocator()
+        parent = Process("padre", 1, memory_size=pages * 4, pid=pids.allocate())
+        memory.allocate_memory(parent)
+        start = time.perf_counter()
+        for _ in range(workers):
+            if mode == "fork":
+                memory.fork(parent, parent.fork(pids.allocate()))
+            else:
+                memory.allocate_memory(Process("hijo", 1, memory_size=pages * 4,
+                                               pid=pids.allocate()))
+        elapsed = time.perf_counter() - start
+        used = memory.get_statistics()['used_frames']
+        print(f"{mode:8s}: {elapsed * 1000:8.2f} ms, {used} marcos usados")
+
+def bench_page_table(frames=65536, processes=64, references=200000):
+    """Tabla de páginas en diccionario frente a tabla invertida"""
+    print("\nTabla de páginas (%d marcos, %d procesos)" % (frames, processes))
+    for inverted in (False, True):
+        memory = MemoryManager(total_frames=frames, inverted_page_table=inverted)
+        workers = [Process(f"p{i}", 1, memory_size=2048 * 4, pid=i + 1)
+                   for i in range(processes)]
+        for process in workers:
+            memory.allocate_memory(process)
+        trace = make_trace(workers, references, seed=2)
+        start = time.perf_counter()
+        memory.replay(trace)
+        elapsed = time.perf_counter() - start
+        if inverted:
+            size = memory.page_table.memory_bytes()
+        else:
+            size = sys.getsizeof(memory.page_table)
+        mode = "invertida" if inverted else "dict"
+        print(f"{mode:9s}: {size / 1024:9.1f} KB de traducción, replay {elapsed:.3f} s")
+
+def bench_buddy(sizes=(1 << 12, 1 << 16, 1 << 20, 1 << 24), operations=20000, block=256):
+    """Latencia de reserva de bloques contiguos según el tamaño de la memoria"""
+    print("\nAsignador buddy (bloques de %d marcos)" % block)
+    print("Marcos    | Reserva+liberación (us)")
+    print("-" * 36)
+    for frames in sizes:
+        buddy = BuddyAllocator(frames)
+        start = time.perf_counter()
+        for _ in range(operations):
+            buddy.free_contiguous(buddy.alloc_contiguous(block))
+        elapsed = time.perf_counter() - start
+        print(f"{frames:9d} | {elapsed / operations * 1e6:23.3f}")
+
+def bench_sjf(sizes=(1000, 10000, 100000)):
+    """Selección SJF: añadir N trabajos y extraerlos todos en orden"""
+    print("\nCola de listos SJF")
+    print("Trabajos | Selección total (ms)")
+    print("-" * 32)
+    rng = random.Random(3)
+    for jobs in sizes:
+        scheduler = SJFScheduler()
+        for i in range(jobs):
+            scheduler.add_process(Process(f"j{i}", rng.randint(1, 100)))
+        start = time.perf_counter()
+        while scheduler.get_next_process():
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"{jobs:8d} | {elapsed * 1000:20.2f}")
+
+def bench_priority(sizes=(1000, 10000, 100000), levels=32):
+    """Selección por prioridad: colas por nivel frente a buscar el máximo en una lista"""
+    print("\nCola de listos por prioridades (%d niveles)" % levels)
+    print("Trabajos | Colas por nivel (ms) | Búsqueda lineal (ms)")
+    print("-" * 55)
+    rng = random.Random(4)
+    for jobs in sizes:
+        processes = [Process(f"j{i}", 1, priority=rng.randrange(levels)) for i in range(jobs)]
+        scheduler = PriorityScheduler(levels=levels)
+        for process in processes:
+            scheduler.add_process(process)
+        start = time.perf_counter()
+        while scheduler.get_next_process():
+            pass
+        queue_time = time.perf_counter() - start
+
+        # La búsqueda lineal es cuadrática: se mide con menos extracciones
+        pending = list(processes)
+        picks = min(jobs, 1000)
+        start = time.perf_counter()
+        for _ in range(picks):
+            pending.remove(max(pending, key=lambda p: p.priority))
+        linear_time = (time.perf_counter() - start) * jobs / picks
+        print(f"{jobs:8d} | {queue_time * 1000:20.2f} | {linear_time * 1000:20.2f}")
+
+def bench_round_robin(sizes=(100, 1000, 10000), burst=20, quantum=4):
+    """Ejecución completa de Round Robin: coste por despacho según la longitud de la cola"""
+    print("\nRound Robin hasta terminar (ráfagas de %d, quantum %d)" % (burst, quantum))
+    print("Procesos | Despachos | Por despacho (us)")
+    print("-" * 40)
+    for jobs in sizes:
+        scheduler = RoundRobinScheduler(quantum)
+        for i in range(jobs):
+            scheduler.add_process(Process(f"j{i}", burst))
+        dispatches = 0
+        start = time.perf_counter()
+        while scheduler.execute_step():
+            dispatches += 1
+        elapsed = time.perf_counter() - start
+        print(f"{jobs:8d} | {dispatches:9d} | {elapsed / dispatches * 1e6:17.3f}")
+
+def bench_events(jobs=200, processing_times=(10, 100, 1000, 10000)):
+    """Impresora con trabajos largos: avance unidad a unidad frente a motor de eventos"""
+    print("\nImpresora con %d trabajos: por pasos frente a eventos" % jobs)
+    print("Servicio | Pasos (ms) | Eventos (ms)")
+    print("-" * 38)
+    owner = Process("cliente", 1, pid=1)
+    for processing_time in processing_times:
+        printer = Printer(processing_time=processing_time)
+        for i in range(jobs):
+            printer.add_request(IORequest(owner, IORequestType.PRINT, i))
+        start = time.perf_counter()
+        while printer.queue or printer.busy:
+            printer.process_next()
+        step_time = time.perf_counter() - start
+
+        engine = EventEngine()
+        printer = Printer(processing_time=processing_time, engine=engine)
+        start = time.perf_counter()
+        for i in range(jobs):
+            printer.add_request(IORequest(owner, IORequestType.PRINT, i))
+        engine.run()
+        event_time = time.perf_counter() - start
+        print(f"{processing_time:8d} | {step_time * 1000:10.2f} | {event_time * 1000:12.2f}")
+
+def bench_multicore(core_counts=(1, 4, 16, 64), jobs=20000, burst=20, quantum=4):
+    """Multinúcleo con robo de trabajo: coste por evento y utilización según los núcleos"""
+    print("\nMultinúcleo (%d procesos, ráfagas de %d, quantum %d)" % (jobs, burst, quantum))
+    print("Núcleos | Por evento (us) | Tiempo simulado | Utilización media")
+    print("-" * 65)
+    rng = random.Random(5)
+    for cores in core_counts:
+        scheduler = MultiCoreScheduler(cores, "RR", quantum)
+        for i in range(jobs):
+            scheduler.add_process(Process(f"j{i}", rng.randint(1, 2 * burst)))
+        start = time.perf_counter()
+        summary = scheduler.run()
+        elapsed = time.perf_counter() - start
+        stats = scheduler.get_statistics()
+        utilization = sum(c['utilization'] for c in stats['cores']) / cores
+        print(f"{cores:7d} | {elapsed / summary['steps'] * 1e6:15.3f} | "
+              f"{summary['elapsed_time']:15d} | {utilization * 100:16.1f}%")
+
+def bench_process_table(count=1000000):
+    """Creación de muchos procesos: objetos Process frente a ProcessTable"""
+    print("\nTabla de procesos (%d procesos)" % count)
+    print("Modo         | Creación (s) | Bytes por proceso")
+    print("-" * 48)
+    bursts = [1 + i % 50 for i in range(count)]
+    for mode in ("Process", "ProcessTable"):
+        tracemalloc.start()
+        start = time.perf_counter()
+        if mode == "Process":
+            processes = [Process(f"p{i}", burst) for i, burst in enumerate(bursts)]
+        else:
+            processes = ProcessTable()
+            processes.extend(bursts)
+        elapsed = time.perf_counter() - start
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{mode:12s} | {elapsed:12.3f} | {used / count:17.1f}")
+        del processes
+
+def bench_pids(sizes=(1 << 15, 1 << 22), operations=200000):
+    """Asignador de PIDs: reservar y liberar con la tabla casi llena"""
+    print("\nAsignador de PIDs")
+    print("pid_max  | Reserva+liberación (us)")
+    print("-" * 36)
+    rng = random.Random(6)
+    for pid_max in sizes:
+        pids = PIDAllocator(pid_max)
+        live = [pids.allocate() for _ in range(pid_max * 9 // 10)]
+        start = time.perf_counter()
+        for _ in range(operations):
+            i = rng.randrange(len(live))
+            pids.release(live[i])
+            live[i] = pids.allocate()
+        elapsed = time.perf_counter() - start
+        print(f"{pid_max:8d} | {elapsed / operations * 1e6:23.3f}")
+
+def bench_io_bursts(jobs=2000, cycles=4, burst=10):
+    """Cargas que alternan CPU y E/S: solapamiento entre la CPU y los dispositivos"""
+    print("\nRáfagas CPU/E/S (%d procesos, %d ciclos)" % (jobs, cycles))
+    print("Política | Tiempo (s) | Rendimiento | CPU    | E/S")
+    print("-" * 54)
+    for policy in ("RR", "SJF"):
+        rng = random.Random(7)
+        engine = EventEngine()
+        if policy == "RR":
+            scheduler = RoundRobinScheduler(4, engine=engine)
+        else:
+            scheduler = SJFScheduler(engine=engine)
+        scheduler.attach_device("impresora", Printer(processing_time=burst, engine=engine))
+        scheduler.attach_device("disco", DiskScheduler(engine=engine))
+        for i in range(jobs):
+            bursts = []
+            for _ in range(cycles):
+                if rng.random() < 0.5:
+                    bursts.append(("impresora", i))
+                else:
+                    bursts.append(("disco", rng.randrange(200)))
+                bursts.append(("CPU", rng.randint(1, 2 * burst)))
+            scheduler.add_process(Process(f"j{i}", rng.randint(1, 2 * burst), bursts=bursts))
+        start = time.perf_counter()
+        summary = scheduler.run()
+        elapsed = time.perf_counter() - start
+        print(f"{policy:8s} | {elapsed:10.3f} | {summary['throughput']:11.4f} | "
+              f"{summary['cpu_utilization'] * 100:5.1f}% | {summary['io_utilization'] * 100:5.1f}%")
+
+def bench_semaphores(workers=(2, 8, 32), operations=20000, buffer_size=4):
+    """Productor-consumidor con contención: procesos bloqueados frente a sondeo"""
+    print("\nProductor-consumidor (buffer %d, %d operaciones)" % (buffer_size, operations))
+    print("Procesos | Modo      | Operaciones/tick | Despachos perdidos")
+    print("-" * 60)
+    for count in workers:
+        for mode in ("sondeo", "bloqueo"):
+            scheduler = RoundRobinScheduler(1)
+            # Sin planificador, el semáforo no saca de la cola a quien espera
+            pc = ProducerConsumer(buffer_size, scheduler if mode == "bloqueo" else None)
+            blocked = (pc.empty.resumes, pc.full.resumes)
+            # Un productor por cada cuatro procesos: los consumidores compiten
+            producers = set()
+            for i in range(count):
+                process = Process(f"w{i}", operations * 10)
+                if i % 4 == 0:
+                    producers.add(process)
+                scheduler.add_process(process)
+            wasted = 0
+            start = scheduler.clock.now
+            while len(pc.history) < operations:
+                scheduler.execute_step()
+                process = scheduler.last_dispatched
+                if any(process in waiting for waiting in blocked):
+                    wasted += 1  # Despachado mientras esperaba en el semáforo
+                elif process in producers:
+                    pc.produce(process, len(pc.history))
+                else:
+                    pc.consume(process)
+            elapsed = scheduler.clock.now - start
+            print(f"{count:8d} | {mode:9s} | {operations / elapsed:16.3f} | {wasted:18d}")
+
+if __name__ == '__main__':
+    bench_allocation()
+    bench_replay()
+    bench_hit_ratio_curve()
+    bench_fork()
+    bench_page_table()
+    bench_buddy()
+    bench_sjf()
+    bench_priority()
+    bench_round_robin()
+    bench_events()
+    bench_multicore()
+    bench_process_table()
+    bench_pids()
+    bench_io_bursts()
+    bench_semaphores()
\ No newline at end of file
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+
+class SimulationClock:
+    """Reloj lógico monótono compartido por los componentes del simulador"""
+    def __init__(self, start=0):
+        self.now = start
+
+    def tick(self, units=1):
+        """Avanza el reloj y devuelve el nuevo instante"""
+        self.now += units
+        return self.now
+
+    def advance_to(self, instant):
+        """Avanza el reloj hasta un instante (nunca retrocede)"""
+        if instant > self.now:
+            self.now = instant
+        return self.now
\ No newline at end of file
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+import heapq
+from itertools import count
+from clock import SimulationClock
+
+class EventEngine:
+    """
+    Motor de simulación por eventos discretos: un montículo de eventos con
+    marca de tiempo. El reloj salta directamente al siguiente evento en lugar
+    de avanzar de unidad en unidad, así los tramos sin actividad no cuestan nada.
+    """
+    def __init__(self, clock=None):
+        self.clock = clock or SimulationClock()
+        self.queue = []  # Montículo de [instante, orden, acción, argumentos]
+        self.sequence = count()  # Desempate FIFO entre eventos simultáneos
+        self.processed = 0
+
+    @property
+    def now(self):
+        return self.clock.now
+
+    def schedule(self, instant, action, *args):
+        """Programa action(*args) en el instante indicado y devuelve el evento"""
+        event = [max(instant, self.clock.now), next(self.sequence), action, args]
+        heapq.heappush(self.queue, event)
+        return event
+
+    def schedule_in(self, delay, action, *args):
+        """Programa action(*args) dentro de delay unidades de tiempo"""
+        return self.schedule(self.clock.now + delay, action, *args)
+
+    def cancel(self, event):
+        """Anula un evento pendiente (se descarta al salir del montículo)"""
+        event[2] = None
+
+    def next_time(self):
+        """Instante del próximo evento pendiente, o None si no hay"""
+        while self.queue and self.queue[0][2] is None:
+            heapq.heappop(self.queue)
+        return self.queue[0][0] if self.queue else None
+
+    def step(self):
+        """Procesa el siguiente evento; devuelve False si no quedan"""
+        queue = self.queue
+        while queue:
+            instant, _, action, args = heapq.heappop(queue)
+            if action is None:
+                continue
+            self.clock.advance_to(instant)
+            self.processed += 1
+            action(*args)
+            return True
+        return False
+
+    def run(self, until=None, max_events=None):
+        """
+        Procesa eventos hasta vaciar la cola, llegar al instante until o
+        procesar max_events. Devuelve el número de eventos procesados.
+        """
+        processed = 0
+        while max_events is None or processed < max_events:
+            instant = self.next_time()
+            if instant is None or (until is not None and instant > until):
+                break
+            self.step()
+            processed += 1
+        if until is not None:
+            self.clock.advance_to(until)
+        return processed
+
+    def __len__(self):
+        return sum(1 for event in self.queue if event[2] is not None)
\ No newline at end of file
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 from collections import deque
 from enum import Enum
+from itertools import count
 import heapq
+from clock import SimulationClock
 
 class IORequestType(Enum):
     """Tipos de solicitudes de E/S"""
@@ -11,52 +13,102 @@ class IORequestType(Enum):
 
 class IORequest:
     """Solicitud de E/S"""
-    def __init__(self, process, request_type, data=None, priority=0):
+    def __init__(self, process, request_type, data=None, priority=0, callback=None):
         self.process = process
         self.type = request_type
         self.data = data
         self.priority = priority
+        self.callback = callback  # Se llama al completarse la solicitud
+        self.sequence = 0
         self.arrival_time = 0
+        self.start_time = 0
         self.completion_time = 0
 
     def __lt__(self, other):
-        return self.priority > other.priority  # Mayor prioridad primero
+        # Mayor prioridad primero; a igual prioridad, orden de llegada
+        return (-self.priority, self.sequence) < (-other.priority, other.sequence)
 
 class IODevice:
     """Dispositivo de E/S genérico"""
-    def __init__(self, name, processing_time=1):
+    request_type = IORequestType.READ
+
+    def __init__(self, name, processing_time=1, clock=None, engine=None):
         self.name = name
         self.processing_time = processing_time
         self.current_request = None
         self.queue = []  # Cola de prioridad
+        self.arrival_order = count()
         self.busy = False
-        self.time = 0
+        self.busy_time = 0
+        self.clock = clock or (engine.clock if engine is not None else SimulationClock())
+        # Con motor de eventos cada solicitud programa su propio fin de servicio
+        self.engine = engine
         self.completed_requests = []
 
+    @property
+    def time(self):
+        return self.clock.now
+
     def add_request(self, request):
         """Añade una solicitud a la cola"""
         request.arrival_time = self.time
+        request.sequence = next(self.arrival_order)
         heapq.heappush(self.queue, request)
+        if self.engine is not None and not self.busy:
+            self._start_next()
+
+    def submit(self, process, data, callback):
+        """Encola la ráfaga de E/S de un proceso y avisa con callback al terminar"""
+        self.add_request(IORequest(process, self.request_type, data, process.priority, callback))
 
     def process_next(self):
         """Procesa la siguiente solicitud"""
         if self.busy:
-            self.time += 1
-            if self.time - self.current_request.arrival_time >= self.processing_time:
-                self.current_request.completion_time = self.time
-                self.completed_requests.append(self.current_request)
-                self.busy = False
-                self.current_request = None
+            self.clock.tick()
+            if self.time - self.current_request.start_time >= self.processing_time:
+                self._complete_request()
                 return True
             return False
 
         if self.queue:
             self.current_request = heapq.heappop(self.queue)
+            self.current_request.start_time = self.time
             self.busy = True
             return self.process_next()
 
         return False
 
+    def _complete_request(self):
+        """Cierra la solicitud en curso y deja el dispositivo libre"""
+        request = self.current_request
+        request.completion_time = self.time
+        self.busy_time += request.completion_time - request.start_time
+        self.completed_requests.append(request)
+        self.busy = False
+        self.current_request = None
+        self._request_completed(request)
+        if request.callback is not None:
+            request.callback()
+
+    def _request_completed(self, request):
+        """Punto de extensión para las subclases al terminar una solicitud"""
+        pass
+
+    def _start_next(self):
+        """Evento: atiende la siguiente solicitud y programa su fin de servicio"""
+        if not self.queue:
+            return
+        self.current_request = heapq.heappop(self.queue)
+        self.current_request.start_time = self.time
+        self.busy = True
+        self.engine.schedule_in(self.processing_time, self._end_service)
+
+    def _end_service(self):
+        """Evento de fin de servicio de la solicitud en curso"""
+        self._complete_request()
+        if not self.busy:  # El callback pudo haber iniciado ya otra solicitud
+            self._start_next()
+
     def get_statistics(self):
         """Obtiene estadísticas del dispositivo"""
         if not self.completed_requests:
@@ -82,26 +134,30 @@ class IODevice:
 
 class Printer(IODevice):
     """Impresora simulada"""
-    def __init__(self, name="Printer", processing_time=5):
-        super().__init__(name, processing_time)
+    request_type = IORequestType.PRINT
+
+    def __init__(self, name="Printer", processing_time=5, clock=None, engine=None):
+        super().__init__(name, processing_time, clock, engine)
         self.print_history = []
 
-    def process_next(self):
-        """Procesa la siguiente solicitud de impresión"""
-        if super().process_next():
-            if self.current_request:
-                self.print_history.append({
-                    'time': self.time,
-                    'process': self.current_request.process.pid,
-                    'data': self.current_request.data
-                })
-            return True
-        return False
+    def _request_completed(self, request):
+        """Registra el trabajo impreso"""
+        self.print_history.append({
+            'time': self.time,
+            'process': request.process.pid,
+            'data': request.data
+        })
 
 class DiskScheduler:
     """Planificador de disco"""
-    def __init__(self, total_tracks=200):
+    def __init__(self, total_tracks=200, clock=None, engine=None):
         self.total_tracks = total_tracks
+        self.clock = clock or (engine.clock if engine is not None else SimulationClock())
+        # Con motor de eventos cada búsqueda termina en un evento de fin de búsqueda
+        self.engine = engine
+        self.busy = False
+        self.busy_time = 0
+        self.waiters = {}  # pista -> callbacks de las solicitudes pendientes
         self.current_track = 0
         self.direction = 1  # 1 hacia arriba, -1 hacia abajo
         self.queue = []
@@ -109,10 +165,20 @@ class DiskScheduler:
         self.history = []
         self.total_seeks = 0
 
-    def add_request(self, track):
-        """Añade una solicitud de acceso a pista"""
-        if 0 <= track < self.total_tracks:
-            self.queue.append(track)
+    def add_request(self, track, callback=None):
+        """Añade una solicitud de acceso a pista; callback se llama al llegar a ella"""
+        if not 0 <= track < self.total_tracks:
+            return False
+        self.queue.append(track)
+        self.waiters.setdefault(track, deque()).append(callback)
+        if self.engine is not None and not self.busy:
+            self._start_seek()
+        return True
+
+    def submit(self, process, track, callback):
+        """Encola el acceso a disco de un proceso y avisa con callback al terminar"""
+        if not self.add_request(track, callback):
+            callback()  # Pista fuera de rango: la solicitud no llega a encolarse
 
     def set_algorithm(self, algorithm):
         """Cambia el algoritmo de planificación"""
@@ -122,8 +188,17 @@ class DiskScheduler:
 
     def process_next(self):
         """Procesa la siguiente solicitud según el algoritmo actual"""
-        if not self.queue:
+        next_track = self._select_next()
+        if next_track is None:
             return False
+        self.clock.tick(abs(self.current_track - next_track))
+        self._complete_seek(next_track)
+        return True
+
+    def _select_next(self):
+        """Saca de la cola la siguiente pista según el algoritmo actual"""
+        if not self.queue:
+            return None
 
         next_track = None
 
@@ -152,14 +227,34 @@ class DiskScheduler:
             elif self.queue:
                 next_track = self.queue.pop(0)
 
-        if next_track is not None:
-            seek_time = abs(self.current_track - next_track)
-            self.total_seeks += seek_time
-            self.history.append((self.current_track, next_track))
-            self.current_track = next_track
-            return True
+        return next_track
 
-        return False
+    def _complete_seek(self, track):
+        """Registra el movimiento del cabezal hasta la pista"""
+        seek_time = abs(self.current_track - track)
+        self.total_seeks += seek_time
+        self.busy_time += seek_time
+        self.history.append((self.current_track, track))
+        self.current_track = track
+        waiters = self.waiters.get(track)
+        if waiters:
+            callback = waiters.popleft()
+            if not waiters:
+                del self.waiters[track]
+            if callback is not None:
+                callback()
+
+    def _start_seek(self):
+        """Evento: elige la siguiente pista y programa el fin de la búsqueda"""
+        track = self._select_next()
+        self.busy = track is not None
+        if self.busy:
+            self.engine.schedule_in(abs(self.current_track - track), self._end_seek, track)
+
+    def _end_seek(self, track):
+        """Evento de fin de búsqueda: el cabezal llega a la pista"""
+        self._complete_seek(track)
+        self._start_seek()
 
     def get_statistics(self):
         """Obtiene estadísticas del planificador"""
@@ -1,26 +1,32 @@
 #!/usr/bin/env python3
 import cmd
 import sys
-from process import Process, RoundRobinScheduler, SJFScheduler
-from memory import MemoryManager
+from process import (Process, ProcessState, RoundRobinScheduler, SJFScheduler,
+                     PriorityScheduler, MLFQScheduler, MultiCoreScheduler, PIDAllocator)
+from memory import MemoryManager, BuddyAllocator
 from sync import ProducerConsumer, ReadersWriters, DiningPhilosophers
 from io_devices import IORequest, IORequestType, Printer, DiskScheduler
+from clock import SimulationClock
 
 class OSSimulator(cmd.Cmd):
     """Simulador de Sistema Operativo"""
     intro = 'Bienvenido al Simulador de SO. Escribe help o ? para listar los comandos.\n'
     prompt = 'SO> '
 
-    def __init__(self):
+    def __init__(self, pid_max=32768):
         super().__init__()
         # Inicialización de componentes
-        self.scheduler = RoundRobinScheduler()
-        self.memory = MemoryManager()
-        self.producer_consumer = ProducerConsumer()
-        self.readers_writers = ReadersWriters()
+        self.clock = SimulationClock()
+        self.pids = PIDAllocator(pid_max)
+        self.memory = MemoryManager(clock=self.clock, swap_slots=1024)
+        self.buddy = BuddyAllocator(1024)  # Región de memoria contigua
+        self.scheduler = RoundRobinScheduler(clock=self.clock, memory=self.memory, pids=self.pids)
+        # Los procesos que esperan en un semáforo se bloquean en el planificador
+        self.producer_consumer = ProducerConsumer(scheduler=self.scheduler)
+        self.readers_writers = ReadersWriters(scheduler=self.scheduler)
         self.philosophers = DiningPhilosophers()
-        self.printer = Printer()
-        self.disk = DiskScheduler()
+        self.printer = Printer(clock=self.clock)
+        self.disk = DiskScheduler(clock=self.clock)
         self.processes = {}
 
     def do_proceso(self, arg):
@@ -32,6 +38,8 @@ class OSSimulator(cmd.Cmd):
         proceso suspender <pid>
         proceso reanudar <pid>
         proceso terminar <pid>
+        proceso fork <pid>
+        proceso afinidad <pid> <nucleo,nucleo,...|todos>
         """
         args = arg.split()
         if not args:
@@ -45,10 +53,16 @@ class OSSimulator(cmd.Cmd):
             try:
                 priority = int(args[3]) if len(args) > 3 else 0
                 memory = int(args[4]) if len(args) > 4 else 10
-                process = Process(args[1], int(args[2]), priority, memory)
+                burst_time = int(args[2])
+                pid = self.pids.allocate()
+                if pid is None:
+                    print(f"Error: No quedan PIDs libres (pid_max={self.pids.pid_max}).")
+                    return
+                process = Process(args[1], burst_time, priority, memory, pid)
                 self.processes[process.pid] = process
-                self.scheduler.add_process(process)
+                # Carga sus páginas antes de pasar a la cola de listos
                 self.memory.allocate_memory(process)
+                self.scheduler.add_process(process)
                 print(f"Proceso creado con PID {process.pid}")
             except ValueError:
                 print("Error: Los argumentos numéricos deben ser enteros.")
@@ -77,18 +91,88 @@ class OSSimulator(cmd.Cmd):
                     print(f"Prioridad: {process.priority}")
                     print(f"Tiempo total: {process.burst_time}")
                     print(f"Tiempo restante: {process.remaining_time}")
-                    print(f"Tiempo de espera: {process.waiting_time}")
+                    print(f"Tiempo de espera: {self.scheduler.waiting_time(process)}")
                 else:
                     print(f"Error: No existe el proceso con PID {pid}")
             except ValueError:
                 print("Error: El PID debe ser un número entero.")
 
+        elif args[0] == 'terminar':
+            if len(args) < 2:
+                print("Error: Falta el PID del proceso.")
+                return
+            try:
+                pid = int(args[1])
+                if pid not in self.processes:
+                    print(f"Error: No existe el proceso con PID {pid}")
+                elif self.scheduler.terminate_process(self.processes[pid]):
+                    print(f"Proceso {pid} terminado y su memoria liberada.")
+                else:
+                    print(f"El proceso {pid} ya había terminado.")
+            except ValueError:
+                print("Error: El PID debe ser un número entero.")
+
+        elif args[0] == 'fork':
+            if len(args) < 2:
+                print("Error: Falta el PID del proceso padre.")
+                return
+            try:
+                pid = int(args[1])
+                if pid not in self.processes:
+                    print(f"Error: No existe el proceso con PID {pid}")
+                    return
+                parent = self.processes[pid]
+                if parent.state == ProcessState.TERMINATED:
+                    print(f"Error: El proceso {pid} ya terminó.")
+                    return
+                child_pid = self.pids.allocate()
+                if child_pid is None:
+                    print(f"Error: No quedan PIDs libres (pid_max={self.pids.pid_max}).")
+                    return
+                child = parent.fork(child_pid)
+                if not self.memory.fork(parent, child):
+                    self.pids.release(child_pid)
+                    print(f"Error: El proceso {pid} no tiene memoria asignada.")
+                    return
+                self.processes[child.pid] = child
+                self.scheduler.add_process(child)
+                print(f"Proceso hijo creado con PID {child.pid} (páginas compartidas con {pid})")
+            except ValueError:
+                print("Error: El PID debe ser un número entero.")
+
+        elif args[0] == 'afinidad':
+            if len(args) < 3:
+                print("Error: Faltan el PID y los núcleos permitidos.")
+                return
+            try:
+                pid = int(args[1])
+                cores = None if args[2] == 'todos' else {int(c) for c in args[2].split(',')}
+            except ValueError:
+                print("Error: El PID y los núcleos deben ser números enteros.")
+                return
+            if pid not in self.processes:
+                print(f"Error: No existe el proceso con PID {pid}")
+                return
+            if cores is not None and any(core < 0 for core in cores):
+                print("Error: Los núcleos deben ser números no negativos.")
+                return
+            if cores is not None and isinstance(self.scheduler, MultiCoreScheduler) and \
+                    max(cores) >= len(self.scheduler.cores):
+                print(f"Error: Solo hay {len(self.scheduler.cores)} núcleos "
+                      f"(0 a {len(self.scheduler.cores) - 1}).")
+                return
+            self.processes[pid].affinity = cores
+            allowed = 'todos' if cores is None else ', '.join(map(str, sorted(cores)))
+            print(f"Afinidad del proceso {pid}: núcleos {allowed}")
+
     def do_planificador(self, arg):
         """
         Gestión del planificador:
         planificador info
         planificador ejecutar [pasos]
-        planificador cambiar <RR|SJF> [quantum]
+        planificador correr [hasta]
+        planificador cambiar <RR|SJF|PRIO|MLFQ> [quantum]
+        planificador nucleos <n> [RR|SJF] [quantum]
         """
         args = arg.split()
         if not args:
@@ -97,12 +181,22 @@ class OSSimulator(cmd.Cmd):
 
         if args[0] == 'info':
             print("\nInformación del planificador:")
-            print(f"Tipo: {'Round Robin' if isinstance(self.scheduler, RoundRobinScheduler) else 'SJF'}")
-            if isinstance(self.scheduler, RoundRobinScheduler):
+            print(f"Tipo: {self.scheduler.name}")
+            if isinstance(self.scheduler, (RoundRobinScheduler, PriorityScheduler)):
                 print(f"Quantum: {self.scheduler.quantum}")
-            print(f"Procesos en cola: {len(self.scheduler.ready_queue)}")
-            if self.scheduler.running_process:
-                print(f"Proceso en ejecución: {self.scheduler.running_process}")
+            elif isinstance(self.scheduler, MLFQScheduler):
+                print(f"Quanta por nivel: {self.scheduler.quanta}")
+            print(f"Procesos en cola: {len(self.scheduler.ready_processes())}")
+            for process in self.scheduler.running_processes():
+                print(f"Proceso en ejecución: {process}")
+            if isinstance(self.scheduler, MultiCoreScheduler):
+                stats = self.scheduler.get_statistics()
+                print("\nNúcleo | Utilización | En cola | Migraciones")
+                print("-" * 45)
+                for core in stats['cores']:
+                    print(f"{core['core']:6d} | {core['utilization'] * 100:10.1f}% | "
+                          f"{core['queue_length']:7d} | {core['migrations']:11d}")
+                print(f"Robos de trabajo: {stats['steals']}")
 
         elif args[0] == 'ejecutar':
             steps = int(args[1]) if len(args) > 1 else 1
@@ -112,14 +206,90 @@ class OSSimulator(cmd.Cmd):
                     break
             print("Ejecución completada.")
 
+        elif args[0] == 'correr':
+            try:
+                until = int(args[1]) if len(args) > 1 else None
+            except ValueError:
+                print("Error: El instante final debe ser un número entero.")
+                return
+            summary = self.scheduler.run(until)
+            print("\nResumen de la ejecución:")
+            print(f"Procesos completados: {summary['completed']}")
+            print(f"Tiempo simulado: {summary['elapsed_time']} ticks")
+            print(f"Rendimiento: {summary['throughput']:.3f} procesos/tick")
+            print(f"Cambios de contexto: {summary['context_switches']}")
+            print("Métrica   | Media    | p50   | p95   | p99")
+            print("-" * 45)
+            for metric, label in (('waiting', 'Espera'), ('turnaround', 'Retorno')):
+                print(f"{label:9s} | {summary[f'avg_{metric}_time']:8.2f} | "
+                      f"{summary[f'p50_{metric}_time']:5d} | {summary[f'p95_{metric}_time']:5d} | "
+                      f"{summary[f'p99_{metric}_time']:5d}")
+
+        elif args[0] == 'cambiar':
+            if len(args) < 2:
+                print("Error: Falta especificar el algoritmo.")
+                return
+            try:
+                quantum = int(args[2]) if len(args) > 2 else 2
+            except ValueError:
+                print("Error: El quantum debe ser un número entero.")
+                return
+            if quantum <= 0:
+                print("Error: El quantum debe ser positivo.")
+                return
+
+            options = {'clock': self.clock, 'memory': self.memory, 'pids': self.pids}
+            if args[1] == 'RR':
+                scheduler = RoundRobinScheduler(quantum, **options)
+            elif args[1] == 'SJF':
+                scheduler = SJFScheduler(**options)
+            elif args[1] == 'PRIO':
+                scheduler = PriorityScheduler(quantum, **options)
+            elif args[1] == 'MLFQ':
+                scheduler = MLFQScheduler((quantum, 2 * quantum, 4 * quantum), **options)
+            else:
+                print("Error: Algoritmo no válido.")
+                return
+            scheduler.migrate_from(self.scheduler)
+            self.scheduler = scheduler
+            print(f"Planificador cambiado a {scheduler.name}")
+
+        elif args[0] == 'nucleos':
+            if len(args) < 2:
+                print("Error: Falta el número de núcleos.")
+                return
+            try:
+                cores = int(args[1])
+                quantum = int(args[3]) if len(args) > 3 else 2
+            except ValueError:
+                print("Error: El número de núcleos y el quantum deben ser enteros.")
+                return
+            policy = args[2] if len(args) > 2 else 'RR'
+            if cores <= 0 or quantum <= 0:
+                print("Error: El número de núcleos y el quantum deben ser positivos.")
+                return
+            if policy not in MultiCoreScheduler.POLICIES:
+                print("Error: Algoritmo no válido para multinúcleo (use RR o SJF).")
+                return
+            scheduler = MultiCoreScheduler(cores, policy, quantum, clock=self.clock,
+                                           memory=self.memory, pids=self.pids)
+            scheduler.migrate_from(self.scheduler)
+            self.scheduler = scheduler
+            print(f"Planificador cambiado a {scheduler.name}")
+
     def do_memoria(self, arg):
         """
         Gestión de memoria:
         memoria info
         memoria marcos
         memoria paginas <pid>
-        memoria acceder <pid> <pagina>
-        memoria algoritmo <LRU|FIFO>
+        memoria acceder <pid> <pagina> [escritura]
+        memoria algoritmo <LRU|FIFO|CLOCK|SECOND_CHANCE|AGING>
+        memoria tlb <entradas> [vias] [LRU|RANDOM]
+        memoria paginacion <demanda|completa> [prefetch]
+        memoria buddy info
+        memoria buddy reservar <kb>
+        memoria buddy liberar <direccion>
         """
         args = arg.split()
         if not args:
@@ -136,20 +306,116 @@ class OSSimulator(cmd.Cmd):
             print(f"Fallos de página: {stats['page_faults']}")
             print(f"Aciertos de página: {stats['page_hits']}")
             print(f"Tasa de aciertos: {stats['hit_ratio']:.2f}")
+            print(f"Páginas precargadas: {stats['prefetched_pages']}")
+            print(f"Marcos compartidos: {stats['shared_frames']}")
+            print(f"Fallos por copia en escritura: {stats['cow_faults']}")
+            print(f"Swap: {stats['swap_used_slots']}/{stats['swap_slots']} ranuras usadas")
+            print(f"Swap-in: {stats['swap_ins']} ({stats['swap_bytes_in']} bytes)")
+            print(f"Swap-out: {stats['swap_outs']} ({stats['swap_bytes_out']} bytes)")
+            print(f"Entradas de TLB: {stats['tlb_entries']}")
+            print(f"Aciertos de TLB: {stats['tlb_hits']}")
+            print(f"Fallos de TLB: {stats['tlb_misses']}")
+            print(f"Tasa de aciertos de TLB: {stats['tlb_hit_ratio']:.2f}")
 
         elif args[0] == 'marcos':
             self.memory.print_memory_map()
 
+        elif args[0] == 'acceder':
+            if len(args) < 3:
+                print("Error: Faltan argumentos para acceder a la página.")
+                return
+            try:
+                pid = int(args[1])
+                page_id = int(args[2])
+                if pid not in self.processes:
+                    print(f"Error: No existe el proceso con PID {pid}")
+                    return
+
+                process = self.processes[pid]
+                if process.state == ProcessState.TERMINATED:
+                    print(f"Error: El proceso {pid} ya terminó.")
+                elif page_id not in process.page_index:
+                    print(f"Error: El proceso {pid} no tiene la página {page_id}")
+                elif self.memory.access_page(process, page_id, 'escritura' in args[3:]):
+                    print(f"Acierto: la página {page_id} está en memoria.")
+                else:
+                    print(f"Fallo de página: página {page_id} cargada en memoria.")
+            except ValueError:
+                print("Error: El PID y la página deben ser números enteros.")
+
         elif args[0] == 'algoritmo':
             if len(args) < 2:
                 print("Error: Falta especificar el algoritmo.")
                 return
-            if args[1] in ['LRU', 'FIFO']:
-                self.memory.set_replacement_algorithm(args[1])
+            if self.memory.set_replacement_algorithm(args[1]):
                 print(f"Algoritmo cambiado a {args[1]}")
             else:
                 print("Error: Algoritmo no válido.")
 
+        elif args[0] == 'tlb':
+            if len(args) < 2:
+                print("Error: Falta especificar el número de entradas.")
+                return
+            try:
+                entries = int(args[1])
+                ways = int(args[2]) if len(args) > 2 else None
+                policy = args[3] if len(args) > 3 else "LRU"
+                if self.memory.configure_tlb(entries, ways, policy):
+                    print(f"TLB configurada con {entries} entradas.")
+                else:
+                    print("Error: Configuración de TLB no válida.")
+            except ValueError:
+                print("Error: Las entradas y las vías deben ser números enteros.")
+
+        elif args[0] == 'paginacion':
+            if len(args) < 2 or args[1] not in ['demanda', 'completa']:
+                print("Error: Use 'demanda' o 'completa'.")
+                return
+            try:
+                prefetch = int(args[2]) if len(args) > 2 else 0
+                if self.memory.set_demand_paging(args[1] == 'demanda', prefetch):
+                    print(f"Paginación {args[1]} activada para los nuevos procesos.")
+                else:
+                    print("Error: La ventana de prefetch no puede ser negativa.")
+            except ValueError:
+                print("Error: La ventana de prefetch debe ser un número entero.")
+
+        elif args[0] == 'buddy':
+            if len(args) < 2:
+                print("Error: Use 'buddy info', 'buddy reservar <kb>' o 'buddy liberar <direccion>'.")
+                return
+            if args[1] == 'info':
+                stats = self.buddy.get_statistics()
+                print("\nAsignador buddy (memoria contigua):")
+                print(f"Marcos totales: {stats['total_frames']}")
+                print(f"Marcos libres: {stats['free_frames']}")
+                print(f"Bloques asignados: {stats['allocated_blocks']}")
+                print(f"Bloque libre más grande: {stats['largest_free_block']} marcos")
+                print(f"Fragmentación externa: {stats['fragmentation']:.2f}")
+                for size, count in stats['free_blocks'].items():
+                    print(f"  Bloques libres de {size} marcos: {count}")
+            elif args[1] in ['reservar', 'liberar']:
+                if len(args) < 3:
+                    print("Error: Falta el tamaño o la dirección del bloque.")
+                    return
+                try:
+                    value = int(args[2])
+                    if args[1] == 'reservar':
+                        frames = (value + 3) // 4
+                        start = self.buddy.alloc_contiguous(frames)
+                        if start is None:
+                            print("No hay un bloque contiguo suficientemente grande.")
+                        else:
+                            print(f"Bloque reservado en el marco {start}")
+                    elif self.buddy.free_contiguous(value):
+                        print(f"Bloque del marco {value} liberado.")
+                    else:
+                        print(f"Error: No hay un bloque asignado en el marco {value}")
+                except ValueError:
+                    print("Error: El tamaño y la dirección deben ser números enteros.")
+            else:
+                print("Error: Acción no válida. Use 'info', 'reservar' o 'liberar'.")
+
     def do_sincronizacion(self, arg):
         """
         Gestión de sincronización:
@@ -171,10 +437,12 @@ class OSSimulator(cmd.Cmd):
             try:
                 pid = int(args[1])
                 if pid in self.processes:
-                    if self.producer_consumer.produce(self.processes[pid], args[2]):
+                    if self.processes[pid].state == ProcessState.WAITING:
+                        print(f"Error: El proceso {pid} está bloqueado.")
+                    elif self.producer_consumer.produce(self.processes[pid], args[2]):
                         print("Item producido exitosamente.")
                     else:
-                        print("No se pudo producir el item (buffer lleno).")
+                        print("Buffer lleno: el proceso queda bloqueado y producirá el item cuando haya hueco.")
                 else:
                     print(f"Error: No existe el proceso con PID {pid}")
             except ValueError:
@@ -187,11 +455,14 @@ class OSSimulator(cmd.Cmd):
             try:
                 pid = int(args[1])
                 if pid in self.processes:
+                    if self.processes[pid].state == ProcessState.WAITING:
+                        print(f"Error: El proceso {pid} está bloqueado.")
+                        return
                     success, item = self.producer_consumer.consume(self.processes[pid])
                     if success:
                         print(f"Item consumido: {item}")
                     else:
-                        print("No se pudo consumir (buffer vacío).")
+                        print("Buffer vacío: el proceso queda bloqueado hasta que se produzca un item.")
                 else:
                     print(f"Error: No existe el proceso con PID {pid}")
             except ValueError:
@@ -206,12 +477,15 @@ class OSSimulator(cmd.Cmd):
                 if pid not in self.processes:
                     print(f"Error: No existe el proceso con PID {pid}")
                     return
+                if self.processes[pid].state == ProcessState.WAITING:
+                    print(f"Error: El proceso {pid} está bloqueado.")
+                    return
 
                 if args[2] == 'iniciar':
                     if self.readers_writers.start_read(self.processes[pid]):
                         print("Lectura iniciada.")
                     else:
-                        print("No se pudo iniciar la lectura.")
+                        print("Hay un escritor: el proceso queda bloqueado y leerá cuando termine.")
                 elif args[2] == 'terminar':
                     if self.readers_writers.end_read(self.processes[pid]):
                         print("Lectura terminada.")
@@ -231,12 +505,15 @@ class OSSimulator(cmd.Cmd):
                 if pid not in self.processes:
                     print(f"Error: No existe el proceso con PID {pid}")
                     return
+                if self.processes[pid].state == ProcessState.WAITING:
+                    print(f"Error: El proceso {pid} está bloqueado.")
+                    return
 
                 if args[2] == 'iniciar':
                     if self.readers_writers.start_write(self.processes[pid]):
                         print("Escritura iniciada.")
                     else:
-                        print("No se pudo iniciar la escritura.")
+                        print("Recurso ocupado: el proceso queda bloqueado y escribirá cuando quede libre.")
                 elif args[2] == 'terminar':
                     if self.readers_writers.end_write(self.processes[pid]):
                         print("Escritura terminada.")
@@ -302,8 +579,10 @@ class OSSimulator(cmd.Cmd):
                 return
             try:
                 sector = int(args[1])
-                self.disk.add_request(sector)
-                print(f"Solicitud añadida para el sector {sector}")
+                if self.disk.add_request(sector):
+                    print(f"Solicitud añadida para el sector {sector}")
+                else:
+                    print(f"Error: El sector debe estar entre 0 y {self.disk.total_tracks - 1}.")
             except ValueError:
                 print("Error: El sector debe ser un número entero.")
 
@@ -330,6 +609,7 @@ class OSSimulator(cmd.Cmd):
 
     def do_salir(self, arg):
         """Salir del simulador"""
+        self.memory.close()
         print("Gracias por usar el Simulador de SO.")
         return True
 
@@ -349,4 +629,8 @@ Use 'help <comando>' para más información sobre un comando específico.
         """)
 
 if __name__ == '__main__':
-    OSSimulator().cmdloop() 
\ No newline at end of file
+    simulator = OSSimulator()
+    try:
+        simulator.cmdloop()
+    finally:
+        simulator.memory.close()  # También si se sale con Ctrl+C 
\ No newline at end of file
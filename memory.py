@@ -1,14 +1,25 @@
 #!/usr/bin/env python3
-from collections import deque
-import time
+from collections import deque, OrderedDict
+from itertools import islice
+from array import array
+import heapq
+import random
+import mmap
+import tempfile
+from clock import SimulationClock
+
+PAGE_SIZE = 4096  # 4KB por página
 
 class Page:
     """Clase que representa una página en memoria virtual"""
-    def __init__(self, page_id, process_id):
+    def __init__(self, page_id, process_id, load_time=0):
         self.page_id = page_id
         self.process_id = process_id
         self.last_access = 0
-        self.load_time = time.time()
+        self.load_time = load_time
+        self.dirty = False  # Modificada desde la última copia en swap
+        self.swap_slot = None  # Ranura de swap con su contenido, si la hay
+        self.data = None  # Contenido mientras está en memoria (None = página vacía)
 
 class Frame:
     """Clase que representa un marco de página en memoria física"""
@@ -16,103 +27,1066 @@ class Frame:
         self.frame_id = frame_id
         self.page = None
         self.is_free = True
+        self.sharers = []  # Otras páginas que comparten el marco (copia en escritura)
 
-    def load_page(self, page):
+    def load_page(self, page, now=0):
         self.page = page
         self.is_free = False
-        page.last_access = time.time()
+        page.load_time = page.last_access = now
 
     def unload_page(self):
         self.page = None
         self.is_free = True
+        self.sharers = []
+
+class ReplacementPolicy:
+    """Clase base para los algoritmos de reemplazo de páginas"""
+    needs_trace = False  # True si el algoritmo necesita conocer la traza futura
+
+    def page_referenced(self, page):
+        pass
+
+    def reference_skipped(self):
+        """Referencia inválida (página inexistente): no toca ningún marco"""
+        pass
+
+    def page_loaded(self, frame):
+        raise NotImplementedError
+
+    def page_accessed(self, frame):
+        pass
+
+    def frame_released(self, frame):
+        raise NotImplementedError
+
+    def select_victim(self):
+        raise NotImplementedError
+
+class LRUPolicy(ReplacementPolicy):
+    """Least Recently Used: marcos ordenados del menos al más reciente"""
+    def __init__(self, total_frames=0):
+        self.order = OrderedDict()
+
+    def page_loaded(self, frame):
+        self.order[frame] = None
+        self.order.move_to_end(frame)
+
+    def page_accessed(self, frame):
+        self.order.move_to_end(frame)
+
+    def frame_released(self, frame):
+        self.order.pop(frame, None)
+
+    def select_victim(self):
+        return next(iter(self.order))
+
+class FIFOPolicy(LRUPolicy):
+    """First In First Out: marcos en orden de carga"""
+    def page_accessed(self, frame):
+        pass
+
+class SecondChancePolicy(FIFOPolicy):
+    """FIFO con segunda oportunidad según el bit de referencia"""
+    def __init__(self, total_frames=0):
+        super().__init__(total_frames)
+        self.reference_bits = bytearray(total_frames)
+
+    def page_loaded(self, frame):
+        super().page_loaded(frame)
+        self.reference_bits[frame.frame_id] = 1
+
+    def page_accessed(self, frame):
+        self.reference_bits[frame.frame_id] = 1
+
+    def frame_released(self, frame):
+        super().frame_released(frame)
+        self.reference_bits[frame.frame_id] = 0
+
+    def select_victim(self):
+        while True:
+            frame = next(iter(self.order))
+            if not self.reference_bits[frame.frame_id]:
+                return frame
+            # Segunda oportunidad: limpiar el bit y mover al final de la cola
+            self.reference_bits[frame.frame_id] = 0
+            self.order.move_to_end(frame)
+
+class ClockPolicy(ReplacementPolicy):
+    """Reloj: una manecilla recorre los marcos circularmente limpiando bits de referencia"""
+    def __init__(self, total_frames=0):
+        self.reference_bits = bytearray(total_frames)
+        self.resident = bytearray(total_frames)
+        self.frames = [None] * total_frames
+        self.hand = 0
+
+    def page_loaded(self, frame):
+        frame_id = frame.frame_id
+        self.frames[frame_id] = frame
+        self.resident[frame_id] = 1
+        self.reference_bits[frame_id] = 1
+
+    def page_accessed(self, frame):
+        self.reference_bits[frame.frame_id] = 1
+
+    def frame_released(self, frame):
+        frame_id = frame.frame_id
+        self.frames[frame_id] = None
+        self.resident[frame_id] = 0
+        self.reference_bits[frame_id] = 0
+
+    def select_victim(self):
+        total = len(self.frames)
+        while True:
+            frame_id = self.hand
+            self.hand = (frame_id + 1) % total
+            if not self.resident[frame_id]:
+                continue
+            if self.reference_bits[frame_id]:
+                self.reference_bits[frame_id] = 0
+                continue
+            return self.frames[frame_id]
+
+class AgingPolicy(ReplacementPolicy):
+    """
+    Envejecimiento: cada marco tiene un contador que se desplaza a la derecha
+    periódicamente incorporando su bit de referencia; se reemplaza el menor.
+    Un bit de referencia del periodo en curso pesa más que todo el contador.
+    """
+    REFERENCED = 1 << 30  # Bit que se incorpora al contador en cada periodo
+    CURRENT = 1 << 31     # Peso del bit de referencia del periodo en curso
+
+    def __init__(self, total_frames=0, interval=None):
+        self.counters = array('I', bytes(4 * total_frames))
+        self.reference_bits = bytearray(total_frames)
+        self.frames = [None] * total_frames  # None: marco libre (nunca se elige)
+        # Montículo de (clave, frame_id) con entradas obsoletas: entre dos
+        # envejecimientos la clave de un marco solo puede crecer
+        self.heap = []
+        # Por defecto se envejece cada total_frames referencias: O(1) amortizado
+        self.interval = interval or max(1, total_frames)
+        self.references = 0
+
+    def _key(self, frame_id):
+        return self.counters[frame_id] | (self.CURRENT if self.reference_bits[frame_id] else 0)
+
+    def _age(self):
+        counters = self.counters
+        reference_bits = self.reference_bits
+        heap = []
+        for frame_id, frame in enumerate(self.frames):
+            if frame is not None:
+                counters[frame_id] = (counters[frame_id] >> 1) | \
+                    (self.REFERENCED if reference_bits[frame_id] else 0)
+                heap.append((counters[frame_id], frame_id))
+        self.reference_bits = bytearray(len(counters))
+        heapq.heapify(heap)
+        self.heap = heap
+
+    def page_referenced(self, page):
+        self.references += 1
+        if self.references >= self.interval:
+            self.references = 0
+            self._age()
+
+    def page_loaded(self, frame):
+        frame_id = frame.frame_id
+        self.frames[frame_id] = frame
+        self.counters[frame_id] = self.REFERENCED
+        self.reference_bits[frame_id] = 0
+        heapq.heappush(self.heap, (self.REFERENCED, frame_id))
+
+    def page_accessed(self, frame):
+        self.reference_bits[frame.frame_id] = 1
+
+    def frame_released(self, frame):
+        frame_id = frame.frame_id
+        self.frames[frame_id] = None
+        self.counters[frame_id] = 0
+        self.reference_bits[frame_id] = 0
+
+    def select_victim(self):
+        heap = self.heap
+        while heap:
+            key, frame_id = heap[0]
+            if self.frames[frame_id] is None:
+                heapq.heappop(heap)  # Marco liberado
+                continue
+            current = self._key(frame_id)
+            if current == key:
+                return self.frames[frame_id]
+            heapq.heapreplace(heap, (current, frame_id))  # Referenciado en este periodo
+        return None
+
+class OPTPolicy(ReplacementPolicy):
+    """
+    Óptimo (Belady): reemplaza la página cuyo próximo uso es más lejano.
+    Necesita la traza completa de referencias (pid, page_id) por adelantado.
+    """
+    needs_trace = True
+
+    def __init__(self, total_frames, trace):
+        key_ids = {}
+        keys = array('q')
+        for chunk in MemoryManager._trace_chunks(trace, 65536):
+            for key in map(tuple, chunk):
+                keys.append(key_ids.setdefault(key, len(key_ids)))
+
+        # Pasada hacia atrás: posición del siguiente uso de cada referencia
+        self.never = len(keys)
+        self.next_use = array('q', [self.never]) * len(keys)
+        self.upcoming = array('q', [self.never]) * len(key_ids)
+        for position in range(len(keys) - 1, -1, -1):
+            key_id = keys[position]
+            self.next_use[position] = self.upcoming[key_id]
+            self.upcoming[key_id] = position
+
+        self.key_ids = key_ids
+        self.position = 0
+        self.frame_next_use = {}  # frame_id -> próximo uso de su página
+        self.resident = {}  # frame_id -> Frame
+        self.heap = []  # (-próximo uso, frame_id), con entradas obsoletas
+
+    def _next_use(self, page):
+        key_id = self.key_ids.get((page.process_id, page.page_id))
+        return self.never if key_id is None else self.upcoming[key_id]
+
+    def _push(self, frame):
+        next_use = self._next_use(frame.page)
+        self.frame_next_use[frame.frame_id] = next_use
+        self.resident[frame.frame_id] = frame
+        heapq.heappush(self.heap, (-next_use, frame.frame_id))
+        if len(self.heap) > 2 * len(self.resident) + 64:
+            # Compactar para que las entradas obsoletas no crezcan con la traza
+            self.heap = [(-n, f) for f, n in self.frame_next_use.items()]
+            heapq.heapify(self.heap)
+
+    def page_referenced(self, page):
+        key_id = self.key_ids.get((page.process_id, page.page_id))
+        if key_id is not None and self.position < self.never:
+            self.upcoming[key_id] = self.next_use[self.position]
+        self.position += 1
+
+    def reference_skipped(self):
+        # Las referencias inválidas también ocupan una posición en la traza
+        self.position += 1
+
+    def page_loaded(self, frame):
+        self._push(frame)
+
+    def page_accessed(self, frame):
+        self._push(frame)
+
+    def frame_released(self, frame):
+        self.frame_next_use.pop(frame.frame_id, None)
+        self.resident.pop(frame.frame_id, None)
+
+    def select_victim(self):
+        while True:
+            next_use, frame_id = self.heap[0]
+            if self.frame_next_use.get(frame_id) == -next_use:
+                return self.resident[frame_id]
+            heapq.heappop(self.heap)
+
+REPLACEMENT_POLICIES = {
+    "LRU": (LRUPolicy, lambda page: page.last_access),
+    "FIFO": (FIFOPolicy, lambda page: page.load_time),
+    "OPT": (OPTPolicy, lambda page: page.load_time),
+    "CLOCK": (ClockPolicy, lambda page: page.load_time),
+    "SECOND_CHANCE": (SecondChancePolicy, lambda page: page.load_time),
+    "AGING": (AgingPolicy, lambda page: page.last_access),
+}
+
+class FenwickTree:
+    """Árbol de Fenwick (BIT) para sumas de prefijos en O(log n)"""
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index, delta):
+        index += 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix_sum(self, index):
+        """Suma de las posiciones 0..index-1"""
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+def lru_hit_ratio_curve(trace, max_frames=None, processes=()):
+    """
+    Calcula en una sola pasada la tasa de aciertos LRU para cada número de
+    marcos de 1 a max_frames, usando distancias de pila (algoritmo de Mattson).
+    Si se indican procesos, sus páginas se cargan antes de la traza en el mismo
+    orden que allocate_memory y solo se aceptan referencias a esas páginas.
+    El elemento k-1 del resultado coincide con la tasa de aciertos de
+    MemoryManager(total_frames=k, algorithm="LRU") reproduciendo la traza.
+    """
+    preload = [(process.pid, page_id)
+               for process in processes
+               for page_id in range((process.memory_size + 3) // 4)]
+    valid = set(preload) if processes else None
+    references = [key for chunk in MemoryManager._trace_chunks(trace, 65536)
+                  for key in map(tuple, chunk)
+                  if valid is None or key in valid]
+
+    tree = FenwickTree(len(preload) + len(references))
+    last_position = {}
+    histogram = {}  # distancia de pila -> número de referencias
+
+    for position, key in enumerate(preload + references):
+        previous = last_position.get(key)
+        if previous is not None:
+            if position >= len(preload):
+                # Páginas distintas usadas desde el último acceso, más ésta
+                distance = tree.prefix_sum(position) - tree.prefix_sum(previous + 1) + 1
+                histogram[distance] = histogram.get(distance, 0) + 1
+            tree.add(previous, -1)
+        tree.add(position, 1)
+        last_position[key] = position
+
+    if max_frames is None:
+        max_frames = len(last_position)
+
+    curve = []
+    hits = 0
+    for frames in range(1, max_frames + 1):
+        hits += histogram.get(frames, 0)
+        curve.append(hits / len(references) if references else 0)
+    return curve
+
+class TLB:
+    """
+    Translation Lookaside Buffer: caché de traducciones (pid, page_id) -> (página, marco).
+    Con ways=None es totalmente asociativa; si no, tiene entries // ways
+    conjuntos de ways entradas. El reemplazo dentro de un conjunto es LRU o RANDOM.
+    """
+    def __init__(self, entries=16, ways=None, policy="LRU", seed=0):
+        self.entries = entries
+        self.ways = min(ways or entries, entries)
+        self.num_sets = max(1, entries // self.ways)
+        self.policy = policy
+        self.sets = [OrderedDict() for _ in range(self.num_sets)]
+        self.random = random.Random(seed)
+        self.hits = 0
+        self.misses = 0
+
+    def _set_for(self, key):
+        pid, page_id = key
+        return self.sets[(page_id + pid * 31) % self.num_sets]
+
+    def lookup(self, key):
+        """Busca una traducción; devuelve (página, marco) o None si hay fallo"""
+        entries = self.sets[0] if self.num_sets == 1 else self._set_for(key)
+        entry = entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.policy == "LRU":
+            entries.move_to_end(key)
+        return entry
+
+    def insert(self, key, entry):
+        """Guarda una traducción, expulsando otra si el conjunto está lleno"""
+        entries = self.sets[0] if self.num_sets == 1 else self._set_for(key)
+        if key not in entries and len(entries) >= self.ways:
+            if self.policy == "LRU":
+                entries.popitem(last=False)
+            else:
+                del entries[self.random.choice(list(entries))]
+        entries[key] = entry
+
+    def invalidate(self, key):
+        """Elimina la traducción de una página expulsada de memoria"""
+        entries = self.sets[0] if self.num_sets == 1 else self._set_for(key)
+        entries.pop(key, None)
+
+    def flush(self):
+        for entries in self.sets:
+            entries.clear()
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0
+
+class InvertedPageTable:
+    """
+    Tabla de páginas invertida: una entrada por marco (pid, page_id, siguiente)
+    más una tabla hash de anclas indexada por (pid, page_id), todo en arreglos
+    preasignados. Ocupa O(total_frames) sin importar cuántos procesos o
+    páginas virtuales existan. Se usa como el diccionario page_table.
+    """
+    EMPTY = -1
+
+    def __init__(self, frames):
+        self.frames = frames
+        total = len(frames)
+        size = 1
+        while size < 2 * total:
+            size *= 2
+        self.mask = size - 1
+        self.anchors = array('q', [self.EMPTY]) * size
+        self.pids = array('q', [self.EMPTY]) * total
+        self.page_ids = array('q', [self.EMPTY]) * total
+        self.next = array('q', [self.EMPTY]) * total
+        self.count = 0
+
+    def _bucket(self, pid, page_id):
+        return ((pid * 0x9E3779B1) ^ page_id) & self.mask
+
+    def _find(self, pid, page_id):
+        entry = self.anchors[self._bucket(pid, page_id)]
+        while entry != self.EMPTY:
+            if self.page_ids[entry] == page_id and self.pids[entry] == pid:
+                return entry
+            entry = self.next[entry]
+        return self.EMPTY
+
+    def get(self, page, default=None):
+        entry = self._find(page.process_id, page.page_id)
+        return default if entry == self.EMPTY else self.frames[entry]
+
+    def __contains__(self, page):
+        return self._find(page.process_id, page.page_id) != self.EMPTY
+
+    def __getitem__(self, page):
+        entry = self._find(page.process_id, page.page_id)
+        if entry == self.EMPTY:
+            raise KeyError(page)
+        return self.frames[entry]
+
+    def __setitem__(self, page, frame):
+        entry = frame.frame_id
+        if self.pids[entry] != self.EMPTY:
+            self._remove(entry)
+        bucket = self._bucket(page.process_id, page.page_id)
+        self.pids[entry] = page.process_id
+        self.page_ids[entry] = page.page_id
+        self.next[entry] = self.anchors[bucket]
+        self.anchors[bucket] = entry
+        self.count += 1
+
+    def __delitem__(self, page):
+        entry = self._find(page.process_id, page.page_id)
+        if entry == self.EMPTY:
+            raise KeyError(page)
+        self._remove(entry)
+
+    def _remove(self, entry):
+        bucket = self._bucket(self.pids[entry], self.page_ids[entry])
+        if self.anchors[bucket] == entry:
+            self.anchors[bucket] = self.next[entry]
+        else:
+            previous = self.anchors[bucket]
+            while self.next[previous] != entry:
+                previous = self.next[previous]
+            self.next[previous] = self.next[entry]
+        self.pids[entry] = self.page_ids[entry] = self.next[entry] = self.EMPTY
+        self.count -= 1
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for entry in range(len(self.pids)):
+            if self.pids[entry] != self.EMPTY:
+                yield self.frames[entry].page
+
+    def memory_bytes(self):
+        """Bytes ocupados por los arreglos de traducción"""
+        return sum(a.itemsize * len(a) for a in (self.anchors, self.pids, self.page_ids, self.next))
+
+class SwapSpace:
+    """
+    Área de intercambio respaldada por un archivo mapeado en memoria (mmap),
+    dividida en ranuras de una página. Las ranuras llevan un contador de
+    referencias para que un fork pueda compartirlas.
+    """
+    def __init__(self, slots, path=None, page_size=PAGE_SIZE):
+        self.slots = slots
+        self.page_size = page_size
+        if path is None:
+            self.file = tempfile.TemporaryFile()
+        else:
+            self.file = open(path, 'w+b')
+        self.file.truncate(slots * page_size)
+        self.map = mmap.mmap(self.file.fileno(), slots * page_size)
+        self.free_slots = deque(range(slots))
+        self.slot_refs = array('I', [0]) * slots
+        self.swap_ins = 0
+        self.swap_outs = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def allocate(self):
+        """Reserva una ranura libre; devuelve None si el swap está lleno"""
+        if not self.free_slots:
+            return None
+        slot = self.free_slots.popleft()
+        self.slot_refs[slot] = 1
+        return slot
+
+    def share(self, slot):
+        self.slot_refs[slot] += 1
+
+    def free(self, slot):
+        """Suelta una referencia a la ranura y la libera cuando llega a cero"""
+        self.slot_refs[slot] -= 1
+        if self.slot_refs[slot] == 0:
+            self.free_slots.append(slot)
+
+    def write(self, slot, data):
+        """Escribe el contenido de una página (swap-out)"""
+        offset = slot * self.page_size
+        data = (data or b'')[:self.page_size]
+        self.map[offset:offset + self.page_size] = data.ljust(self.page_size, b'\0')
+        self.swap_outs += 1
+        self.bytes_out += self.page_size
+
+    def read(self, slot):
+        """Lee el contenido de una página (swap-in)"""
+        offset = slot * self.page_size
+        self.swap_ins += 1
+        self.bytes_in += self.page_size
+        return self.map[offset:offset + self.page_size]
+
+    def used_slots(self):
+        return self.slots - len(self.free_slots)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+class BuddyAllocator:
+    """
+    Sistema buddy para bloques de marcos físicamente contiguos.
+    Mantiene una lista libre por cada potencia de dos; dividir y fusionar
+    bloques cuesta O(log n). Las direcciones y tamaños se miden en marcos.
+    """
+    def __init__(self, total_frames=1024):
+        self.total_frames = total_frames
+        self.max_order = max(0, total_frames.bit_length() - 1)
+        self.free_lists = [set() for _ in range(self.max_order + 1)]
+        self.allocated = {}  # dirección -> orden del bloque
+        self.free_frames = 0
+
+        # Dividir la memoria en los bloques alineados más grandes posibles
+        start = 0
+        for order in range(self.max_order, -1, -1):
+            while start + (1 << order) <= total_frames:
+                self.free_lists[order].add(start)
+                self.free_frames += 1 << order
+                start += 1 << order
+
+    def alloc_contiguous(self, frames):
+        """
+        Reserva un bloque de al menos frames marcos contiguos.
+        Devuelve la dirección del primer marco o None si no hay espacio.
+        """
+        if frames <= 0:
+            return None
+        order = (frames - 1).bit_length()
+        if order > self.max_order:
+            return None
+
+        current = order
+        while current <= self.max_order and not self.free_lists[current]:
+            current += 1
+        if current > self.max_order:
+            return None
+
+        start = self.free_lists[current].pop()
+        # Dividir hasta el tamaño pedido, dejando libres los compañeros
+        while current > order:
+            current -= 1
+            self.free_lists[current].add(start + (1 << current))
+
+        self.allocated[start] = order
+        self.free_frames -= 1 << order
+        return start
+
+    def free_contiguous(self, start):
+        """Libera un bloque y lo fusiona con sus compañeros libres"""
+        order = self.allocated.pop(start, None)
+        if order is None:
+            return False
+        self.free_frames += 1 << order
+
+        while order < self.max_order:
+            buddy = start ^ (1 << order)
+            if buddy not in self.free_lists[order]:
+                break
+            self.free_lists[order].remove(buddy)
+            start = min(start, buddy)
+            order += 1
+        self.free_lists[order].add(start)
+        return True
+
+    def largest_free_block(self):
+        for order in range(self.max_order, -1, -1):
+            if self.free_lists[order]:
+                return 1 << order
+        return 0
+
+    def fragmentation(self):
+        """Fragmentación externa: 1 - bloque libre más grande / memoria libre"""
+        if self.free_frames == 0:
+            return 0
+        return 1 - self.largest_free_block() / self.free_frames
+
+    def get_statistics(self):
+        return {
+            'total_frames': self.total_frames,
+            'free_frames': self.free_frames,
+            'allocated_blocks': len(self.allocated),
+            'largest_free_block': self.largest_free_block(),
+            'fragmentation': self.fragmentation(),
+            'free_blocks': {1 << order: len(blocks)
+                            for order, blocks in enumerate(self.free_lists) if blocks}
+        }
 
 class MemoryManager:
     """Gestor de memoria virtual con paginación"""
-    def __init__(self, total_frames=64, algorithm="LRU"):
+    def __init__(self, total_frames=64, algorithm="LRU", clock=None,
+                 tlb_entries=16, tlb_ways=None, tlb_policy="LRU",
+                 demand_paging=False, prefetch=0, swap_slots=0, swap_path=None,
+                 inverted_page_table=False):
         self.total_frames = total_frames
+        self.clock = clock or SimulationClock()
         self.frames = [Frame(i) for i in range(total_frames)]
-        self.page_table = {}  # Mapeo de páginas a marcos
-        self.algorithm = algorithm
+        self.free_frames = deque(self.frames)  # Lista de marcos libres
+        # Mapeo de páginas a marcos: diccionario o tabla invertida por marco
+        self.inverted_page_table = inverted_page_table
+        self.page_table = InvertedPageTable(self.frames) if inverted_page_table else {}
+        self.processes = {}  # Procesos con memoria asignada, por PID
+        self.process_frames = {}  # PID -> marcos ocupados por el proceso
+        self.algorithm = "FIFO"
+        self.policy = FIFOPolicy(total_frames)
+        self.set_replacement_algorithm(algorithm)
         self.page_faults = 0
         self.page_hits = 0
+        self.demand_paging = demand_paging
+        self.prefetch = prefetch  # Páginas siguientes a cargar en cada fallo
+        self.prefetched_pages = 0
+        self.shared_frames = 0  # Marcos compartidos por varios procesos
+        self.cow_faults = 0
+        self.swap = SwapSpace(swap_slots, swap_path) if swap_slots > 0 else None
+        self.tlb = None
+        self.configure_tlb(tlb_entries, tlb_ways, tlb_policy)
 
-    def set_replacement_algorithm(self, algorithm):
-        """Cambia el algoritmo de reemplazo de páginas"""
-        if algorithm in ["LRU", "FIFO"]:
-            self.algorithm = algorithm
-            return True
-        return False
+    def close(self):
+        """Libera el archivo y el mmap del área de intercambio (se puede llamar varias veces)"""
+        if self.swap is not None:
+            self.swap.close()
+            self.swap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def configure_tlb(self, entries, ways=None, policy="LRU"):
+        """Configura la TLB (entries=0 la desactiva); se vacía al reconfigurarla"""
+        if entries < 0 or (ways is not None and ways <= 0) or policy not in ("LRU", "RANDOM"):
+            return False
+        self.tlb = TLB(entries, ways, policy) if entries > 0 else None
+        return True
+
+    def set_replacement_algorithm(self, algorithm, trace=None):
+        """
+        Cambia el algoritmo de reemplazo de páginas.
+        OPT necesita la traza que se reproducirá después con replay().
+        """
+        if algorithm not in REPLACEMENT_POLICIES:
+            return False
+
+        policy_class, order_key = REPLACEMENT_POLICIES[algorithm]
+        if policy_class.needs_trace:
+            if trace is None:
+                return False
+            self.policy = policy_class(self.total_frames, trace)
+        else:
+            self.policy = policy_class(self.total_frames)
+        self.algorithm = algorithm
+        # Reconstruir el orden de reemplazo con las páginas residentes
+        resident = sorted((f for f in self.frames if not f.is_free),
+                          key=lambda f: (order_key(f.page), f.frame_id))
+        for frame in resident:
+            self.policy.page_loaded(frame)
+        return True
+
+    def set_demand_paging(self, enabled, prefetch=0):
+        """Activa o desactiva la paginación bajo demanda para los nuevos procesos"""
+        if prefetch < 0:
+            return False
+        self.demand_paging = enabled
+        self.prefetch = prefetch
+        return True
 
     def allocate_memory(self, process):
-        """Asigna memoria a un proceso"""
-        pages_needed = (process.memory_size + 3) // 4  # 4KB por página
+        """
+        Asigna memoria a un proceso. Con paginación bajo demanda solo se crean
+        los descriptores de página; los marcos se asignan en el primer acceso.
+        """
+        pages_needed = (process.memory_size + 3) // 4  # PAGE_SIZE (4KB) por página
         pages = []
+        self.processes[process.pid] = process
 
         for i in range(pages_needed):
-            page = Page(i, process.pid)
+            page = Page(i, process.pid, self.clock.now)
             pages.append(page)
             process.pages.append(page)
+            process.page_index[page.page_id] = page
+            if self.demand_paging:
+                continue
 
             # Buscar un marco libre o reemplazar según el algoritmo
             frame = self._get_free_frame()
             if frame:
-                frame.load_page(page)
-                self.page_table[page] = frame
+                self._map_page(page, frame)
             else:
                 self._replace_page(page)
 
         return pages
 
+    def free_process(self, pid):
+        """
+        Libera todos los marcos de un proceso terminado.
+        Devuelve el número de marcos liberados.
+        """
+        process = self.processes.pop(pid, None)
+        if process is not None and self.swap is not None:
+            for page in process.pages:
+                if page.swap_slot is not None:
+                    self.swap.free(page.swap_slot)
+                    page.swap_slot = None
+        frames = self.process_frames.pop(pid, ())
+        for frame in frames:
+            if frame.sharers:
+                # Marco compartido: solo se separa la página de este proceso
+                page = frame.page if frame.page.process_id == pid else \
+                    next(p for p in frame.sharers if p.process_id == pid)
+                self._unshare(frame, page)
+            else:
+                self._release_frame(frame)
+        return len(frames)
+
     def _get_free_frame(self):
-        """Busca un marco libre"""
-        for frame in self.frames:
-            if frame.is_free:
-                return frame
+        """Toma un marco de la lista de marcos libres"""
+        if self.free_frames:
+            return self.free_frames.popleft()
         return None
 
+    def _release_frame(self, frame):
+        """Descarga la página de un marco y lo devuelve a la lista de libres"""
+        if frame.is_free:
+            return
+        self._evict(frame, swap_out=False)
+        self.policy.frame_released(frame)
+        frame.unload_page()
+        self.free_frames.append(frame)
+
+    def _map_page(self, page, frame):
+        """Carga una página en un marco y actualiza la tabla de páginas"""
+        if self.swap is not None and page.swap_slot is not None and page.data is None:
+            page.data = self.swap.read(page.swap_slot)
+        frame.load_page(page, self.clock.tick())
+        self.page_table[page] = frame
+        self.process_frames.setdefault(page.process_id, set()).add(frame)
+        self.policy.page_loaded(frame)
+
+    def _evict(self, frame, swap_out=True):
+        """Expulsa las páginas de un marco ocupado para reutilizarlo"""
+        self._unmap(frame.page, frame)
+        if swap_out:
+            self._swap_out(frame.page)
+        if frame.sharers:
+            for page in frame.sharers:
+                self._unmap(page, frame)
+                if swap_out:
+                    self._swap_out(page)
+            frame.sharers = []
+            self.shared_frames -= 1
+
+    def _swap_out(self, page):
+        """
+        Guarda en swap una página expulsada. Solo se escriben las páginas
+        modificadas; las limpias ya tienen su contenido en swap o están vacías.
+        Si el swap está lleno, el contenido se conserva en el descriptor.
+        """
+        if self.swap is None:
+            return
+        if page.dirty:
+            if page.swap_slot is not None and self.swap.slot_refs[page.swap_slot] > 1:
+                # La ranura está compartida con otro proceso: no sobrescribirla
+                self.swap.free(page.swap_slot)
+                page.swap_slot = None
+            if page.swap_slot is None:
+                page.swap_slot = self.swap.allocate()
+                if page.swap_slot is None:
+                    return
+            self.swap.write(page.swap_slot, page.data)
+            page.dirty = False
+        if page.swap_slot is not None:
+            page.data = None
+
+    def _unmap(self, page, frame):
+        """Elimina la traducción de una página a un marco"""
+        if page in self.page_table:
+            del self.page_table[page]
+        self._invalidate_tlb(page)
+        owned = self.process_frames.get(page.process_id)
+        if owned is not None:
+            owned.discard(frame)
+
+    def _unshare(self, frame, page):
+        """Separa una página de un marco compartido sin liberarlo"""
+        self._unmap(page, frame)
+        if page is frame.page:
+            frame.page = frame.sharers.pop()
+        else:
+            frame.sharers.remove(page)
+        if not frame.sharers:
+            self.shared_frames -= 1
+
     def _replace_page(self, new_page):
         """Reemplaza una página según el algoritmo configurado"""
         self.page_faults += 1
+        victim_frame = self.policy.select_victim()
+        self._evict(victim_frame)
+        self._map_page(new_page, victim_frame)
+
+    def _invalidate_tlb(self, page):
+        if self.tlb is not None:
+            self.tlb.invalidate((page.process_id, page.page_id))
 
-        if self.algorithm == "LRU":
-            # Least Recently Used
-            victim_frame = min(
-                [f for f in self.frames if not f.is_free],
-                key=lambda f: f.page.last_access
-            )
-        else:  # FIFO
-            # First In First Out
-            victim_frame = min(
-                [f for f in self.frames if not f.is_free],
-                key=lambda f: f.page.load_time
-            )
-
-        # Eliminar la página víctima de la tabla
-        if victim_frame.page in self.page_table:
-            del self.page_table[victim_frame.page]
-
-        # Cargar la nueva página
-        victim_frame.load_page(new_page)
-        self.page_table[new_page] = victim_frame
-
-    def access_page(self, process, page_id):
-        """Accede a una página de un proceso"""
-        page = next((p for p in process.pages if p.page_id == page_id), None)
+    def access_page(self, process, page_id, write=False, data=None):
+        """
+        Accede (lectura o escritura) a una página de un proceso.
+        Una escritura marca la página como modificada; data es el nuevo contenido.
+        """
+        if self.tlb is not None:
+            entry = self.tlb.lookup((process.pid, page_id))
+            if entry is not None:
+                # Acierto en la TLB: no se consulta la tabla de páginas
+                hit = self._reference(entry[0], entry[1], write)
+                if write:
+                    self._write(entry[0], data)
+                return hit
+
+        page = process.page_index.get(page_id)
         if not page:
+            self.policy.reference_skipped()
             return False
+        hit = self._reference(page, None, write)
+        if write:
+            self._write(page, data)
+        return hit
 
-        if page in self.page_table:
-            frame = self.page_table[page]
-            page.last_access = time.time()
+    def _write(self, page, data):
+        page.dirty = True
+        if data is not None:
+            page.data = bytes(data[:PAGE_SIZE])
+
+    def _reference(self, page, frame=None, write=False):
+        """
+        Referencia una página; devuelve True si estaba en memoria.
+        frame es el marco ya traducido por la TLB, si lo hubo.
+        """
+        self.policy.page_referenced(page)
+        if frame is None:
+            frame = self.page_table.get(page)
+            if frame is not None and self.tlb is not None:
+                self.tlb.insert((page.process_id, page.page_id), (page, frame))
+
+        if frame is not None:
+            if write and frame.sharers:
+                self._copy_on_write(page, frame)
+                return False
+            page.last_access = self.clock.tick()
+            self.policy.page_accessed(frame)
             self.page_hits += 1
             return True
+        self._page_fault(page)
+        return False
+
+    def _page_fault(self, page):
+        """
+        Atiende un fallo de página con un marco libre o reemplazando otra
+        página, y guarda la nueva traducción en la TLB.
+        """
+        frame = self._get_free_frame()
+        if frame:
+            self.page_faults += 1
+            self._map_page(page, frame)
         else:
             self._replace_page(page)
+        if self.tlb is not None:
+            self.tlb.insert((page.process_id, page.page_id), (page, self.page_table[page]))
+        if self.prefetch:
+            self._prefetch(page)
+
+    def _copy_on_write(self, page, frame):
+        """Escritura sobre un marco compartido: la página recibe una copia privada"""
+        self.cow_faults += 1
+        self.page_faults += 1
+        self._unshare(frame, page)
+        new_frame = self._get_free_frame()
+        if new_frame is None:
+            new_frame = self.policy.select_victim()
+            self._evict(new_frame)
+        self._map_page(page, new_frame)
+        if self.tlb is not None:
+            self.tlb.insert((page.process_id, page.page_id), (page, new_frame))
+
+    def fork(self, parent, child):
+        """
+        Clona el espacio de direcciones del padre en el proceso hijo (creado
+        por quien llama, p. ej. con Process.fork). El hijo comparte los marcos
+        del padre y cada página compartida se copia solo cuando alguno de los
+        dos la escribe. Con tabla invertida (una entrada por marco) no se
+        pueden compartir marcos: el hijo hereda el contenido y carga sus
+        páginas bajo demanda. Devuelve False si el padre no tiene memoria
+        asignada o el hijo ya la tiene.
+        """
+        if parent.pid not in self.processes or child.pid in self.processes:
             return False
 
+        self.processes[child.pid] = child
+        owned = self.process_frames.setdefault(child.pid, set())
+        for parent_page in parent.pages:
+            page = Page(parent_page.page_id, child.pid, self.clock.now)
+            page.data = parent_page.data
+            page.dirty = parent_page.dirty
+            if parent_page.swap_slot is not None:
+                page.swap_slot = parent_page.swap_slot
+                self.swap.share(page.swap_slot)
+            child.pages.append(page)
+            child.page_index[page.page_id] = page
+
+            frame = self.page_table.get(parent_page)
+            if frame is not None and not self.inverted_page_table:
+                if not frame.sharers:
+                    self.shared_frames += 1
+                frame.sharers.append(page)
+                self.page_table[page] = frame
+                owned.add(frame)
+        return True
+
+    def _prefetch(self, page):
+        """Carga por adelantado las páginas siguientes del mismo proceso"""
+        process = self.processes.get(page.process_id)
+        if process is None:
+            return
+        faulted_frame = self.page_table[page]
+        for page_id in range(page.page_id + 1, page.page_id + 1 + self.prefetch):
+            next_page = process.page_index.get(page_id)
+            if next_page is None:
+                break
+            if next_page in self.page_table:
+                continue
+            frame = self._get_free_frame()
+            if frame is None:
+                frame = self.policy.select_victim()
+                if frame is faulted_frame:
+                    # Nunca expulsar la página que produjo el fallo
+                    break
+                self._evict(frame)
+            self._map_page(next_page, frame)
+            self.prefetched_pages += 1
+
+    def replay(self, trace, chunk_size=65536, return_mask=False):
+        """
+        Reproduce una traza de referencias (pid, page_id).
+        Acepta un arreglo de NumPy de forma (n, 2) o cualquier iterable de pares.
+        Devuelve los aciertos y fallos y, opcionalmente, una máscara de fallos
+        (un byte por referencia, 1 = fallo).
+        """
+        hits = faults = invalid = 0
+        fault_mask = bytearray() if return_mask else None
+        clock = self.clock
+        page_table_get = self.page_table.get
+        page_referenced = self.policy.page_referenced
+        reference_skipped = self.policy.reference_skipped
+        page_accessed = self.policy.page_accessed
+        page_fault = self._page_fault
+        tlb_lookup = self.tlb.lookup if self.tlb is not None else None
+        tlb_insert = self.tlb.insert if self.tlb is not None else None
+        page_indexes = {pid: p.page_index for pid, p in self.processes.items()}
+
+        for chunk in self._trace_chunks(trace, chunk_size):
+            chunk_mask = bytearray(len(chunk)) if return_mask else None
+            chunk_hits = 0
+            now = clock.now
+            for i, (pid, page_id) in enumerate(chunk):
+                entry = tlb_lookup((pid, page_id)) if tlb_lookup is not None else None
+                if entry is not None:
+                    page, frame = entry
+                else:
+                    index = page_indexes.get(pid)
+                    page = index.get(page_id) if index is not None else None
+                    if page is None:
+                        invalid += 1
+                        reference_skipped()
+                        continue
+                    frame = page_table_get(page)
+                    if frame is not None and tlb_insert is not None:
+                        tlb_insert((pid, page_id), (page, frame))
+
+                page_referenced(page)
+                if frame is not None:
+                    # Acierto: camino rápido sin llamadas intermedias
+                    now += 1
+                    page.last_access = now
+                    page_accessed(frame)
+                    chunk_hits += 1
+                else:
+                    clock.now = now
+                    page_fault(page)
+                    now = clock.now
+                    faults += 1
+                    if chunk_mask is not None:
+                        chunk_mask[i] = 1
+
+            clock.now = now
+            hits += chunk_hits
+            self.page_hits += chunk_hits
+            if fault_mask is not None:
+                fault_mask += chunk_mask
+
+        return {
+            'references': hits + faults + invalid,
+            'hits': hits,
+            'faults': faults,
+            'invalid': invalid,
+            'hit_ratio': hits / (hits + faults) if (hits + faults) > 0 else 0,
+            'fault_mask': fault_mask
+        }
+
+    @staticmethod
+    def _trace_chunks(trace, chunk_size):
+        """Divide una traza en bloques de listas de pares (pid, page_id)"""
+        if hasattr(trace, 'tolist'):
+            # Arreglos de NumPy: convertir cada bloque de una vez
+            for start in range(0, len(trace), chunk_size):
+                yield trace[start:start + chunk_size].tolist()
+            return
+
+        iterator = iter(trace)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
     def get_statistics(self):
         """Obtiene estadísticas del uso de memoria"""
-        used_frames = sum(1 for f in self.frames if not f.is_free)
+        used_frames = self.total_frames - len(self.free_frames)
         return {
             'total_frames': self.total_frames,
             'used_frames': used_frames,
@@ -120,7 +1094,20 @@ class MemoryManager:
             'usage_percent': (used_frames / self.total_frames) * 100,
             'page_faults': self.page_faults,
             'page_hits': self.page_hits,
-            'hit_ratio': self.page_hits / (self.page_hits + self.page_faults) if (self.page_hits + self.page_faults) > 0 else 0
+            'prefetched_pages': self.prefetched_pages,
+            'shared_frames': self.shared_frames,
+            'cow_faults': self.cow_faults,
+            'swap_slots': self.swap.slots if self.swap else 0,
+            'swap_used_slots': self.swap.used_slots() if self.swap else 0,
+            'swap_ins': self.swap.swap_ins if self.swap else 0,
+            'swap_outs': self.swap.swap_outs if self.swap else 0,
+            'swap_bytes_in': self.swap.bytes_in if self.swap else 0,
+            'swap_bytes_out': self.swap.bytes_out if self.swap else 0,
+            'hit_ratio': self.page_hits / (self.page_hits + self.page_faults) if (self.page_hits + self.page_faults) > 0 else 0,
+            'tlb_entries': self.tlb.entries if self.tlb else 0,
+            'tlb_hits': self.tlb.hits if self.tlb else 0,
+            'tlb_misses': self.tlb.misses if self.tlb else 0,
+            'tlb_hit_ratio': self.tlb.hit_ratio() if self.tlb else 0
         }
 
     def print_memory_map(self):
@@ -130,8 +1117,6 @@ class MemoryManager:
         print("-" * 40)
         for frame in self.frames:
             if not frame.is_free:
-                last_access = time.strftime('%H:%M:%S', 
-                    time.localtime(frame.page.last_access))
-                print(f"{frame.frame_id:5d} | {frame.page.process_id:3d} | {frame.page.page_id:6d} | {last_access}")
+                print(f"{frame.frame_id:5d} | {frame.page.process_id:3d} | {frame.page.page_id:6d} | {frame.page.last_access}")
             else:
                 print(f"{frame.frame_id:5d} | --- | ------ | --------") 
\ No newline at end of file
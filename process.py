@@ -1,7 +1,22 @@
 #!/usr/bin/env python3
 from enum import Enum
 from collections import deque
-import time
+from itertools import count, islice
+import heapq
+import random
+import threading
+from array import array
+from bisect import bisect_left
+from weakref import WeakValueDictionary
+from clock import SimulationClock
+from events import EventEngine
+
+def percentile(values, p):
+    """Percentil p (0-100) por rango más cercano de una lista ordenada"""
+    if not values:
+        return 0
+    index = max(0, -(-len(values) * p // 100) - 1)
+    return values[min(index, len(values) - 1)]
 
 class ProcessState(Enum):
     """Estados posibles de un proceso"""
@@ -11,115 +26,1190 @@ class ProcessState(Enum):
     WAITING = "Esperando"
     TERMINATED = "Terminado"
 
+class PIDAllocator:
+    """
+    Asignador de PIDs con mapa de bits de varios niveles: el nivel 0 marca
+    los PIDs libres y cada nivel superior marca las palabras de 64 bits del
+    nivel inferior que tienen algún libre. El PID libre más bajo se encuentra
+    bajando un bit por nivel (3 niveles para 32768 PIDs, 4 para 4194304).
+    Como en Linux, los PIDs válidos van de 1 a pid_max - 1.
+    """
+    def __init__(self, pid_max=32768):
+        self.pid_max = pid_max
+        self.lock = threading.Lock()
+        self.levels = []
+        size = pid_max
+        while True:
+            words = (size + 63) // 64
+            level = array('Q', [(1 << 64) - 1]) * words
+            # Bits sobrantes de la última palabra: fuera de rango
+            if size % 64:
+                level[-1] = (1 << (size % 64)) - 1
+            self.levels.append(level)
+            if words == 1:
+                break
+            size = words
+        self.in_use = 0
+        self._clear(0)  # El PID 0 no se asigna
+
+    def _clear(self, index, start=0):
+        """
+        Marca un PID (o, con start > 0, una palabra del nivel inferior) como
+        ocupado y propaga las palabras llenas hacia arriba
+        """
+        for level in self.levels[start:]:
+            word, bit = divmod(index, 64)
+            level[word] &= ~(1 << bit)
+            if level[word]:
+                return
+            index = word
+
+    def _set(self, pid):
+        """Marca un PID como libre y propaga hacia arriba"""
+        index = pid
+        for level in self.levels:
+            word, bit = divmod(index, 64)
+            was_empty = not level[word]
+            level[word] |= 1 << bit
+            if not was_empty:
+                return
+            index = word
+
+    def _allocate(self):
+        """Reserva el PID libre más bajo (con el cerrojo ya tomado)"""
+        levels = self.levels
+        if not levels[-1][0]:
+            return None
+        index = 0
+        for level in reversed(levels):
+            word = level[index]
+            index = index * 64 + (word & -word).bit_length() - 1
+        self._clear(index)
+        self.in_use += 1
+        return index
+
+    def allocate(self):
+        """Devuelve el PID libre más bajo, o None si se alcanzó pid_max"""
+        with self.lock:
+            return self._allocate()
+
+    def allocate_many(self, n):
+        """
+        Reserva n PIDs de forma atómica (los más bajos libres, en orden) y
+        devuelve un array; None si no quedan suficientes y no reserva ninguno.
+        """
+        with self.lock:
+            if self.available() < n:
+                return None
+            pids = array('i')
+            level0 = self.levels[0]
+            upper = self.levels[:0:-1]
+            full = (1 << 64) - 1
+            while len(pids) < n:
+                # Palabra del nivel 0 con el PID libre más bajo
+                index = 0
+                for level in upper:
+                    word = level[index]
+                    index = index * 64 + (word & -word).bit_length() - 1
+                word, base = level0[index], index * 64
+                need = n - len(pids)
+                if word == full and need >= 64:
+                    pids.extend(range(base, base + 64))  # Palabra entera de una vez
+                    taken = word
+                else:
+                    taken = 0
+                    while word and need:
+                        bit = word & -word
+                        word ^= bit
+                        taken |= bit
+                        need -= 1
+                        pids.append(base + bit.bit_length() - 1)
+                level0[index] &= ~taken
+                if not level0[index]:
+                    self._clear(index, 1)
+            self.in_use += n
+            return pids
+
+    def release(self, pid):
+        """Devuelve un PID para reutilizarlo; False si no estaba asignado"""
+        with self.lock:
+            if not 0 < pid < self.pid_max or self.is_free(pid):
+                return False
+            self._set(pid)
+            self.in_use -= 1
+            return True
+
+    def is_free(self, pid):
+        return bool(self.levels[0][pid // 64] >> (pid % 64) & 1)
+
+    def available(self):
+        return self.pid_max - 1 - self.in_use
+
 class Process:
     """Clase que representa un proceso en el sistema"""
-    _next_pid = 1
-
-    def __init__(self, name, burst_time, priority=0, memory_size=10):
-        self.pid = Process._next_pid
-        Process._next_pid += 1
+    def __init__(self, name, burst_time, priority=0, memory_size=10, pid=None, bursts=None):
+        # Sin PID explícito, el planificador lo asigna al admitir el proceso
+        self.pid = pid
         self.name = name
+        # Ráfagas posteriores a la primera de CPU: ("CPU", duración) o
+        # (dispositivo, argumento) para una ráfaga de E/S
+        self.remaining_time = burst_time  # Lo que queda de la ráfaga de CPU actual
         self.burst_time = burst_time
-        self.remaining_time = burst_time
+        merged = deque()
+        for kind, argument in bursts or ():
+            if kind == "CPU":
+                self.burst_time += argument
+                # Las ráfagas de CPU seguidas se ejecutan como una sola
+                if not merged:
+                    self.remaining_time += argument
+                    continue
+                if merged[-1][0] == "CPU":
+                    merged[-1] = ("CPU", merged[-1][1] + argument)
+                    continue
+            merged.append((kind, argument))
+        self.bursts = merged or None
         self.priority = priority
         self.state = ProcessState.NEW
         self.memory_size = memory_size
         self.waiting_time = 0
         self.turnaround_time = 0
         self.start_time = None
+        self.arrival_time = None  # Primera vez que quedó listo
+        self.ready_since = None  # Instante en que entró en la cola de listos
         self.pages = []
+        self.page_index = {}  # page_id -> Page
+        self.affinity = None  # Núcleos permitidos (None: cualquiera)
+        self.last_core = None  # Último núcleo en el que se ejecutó
 
-    def execute(self, time_slice=1):
-        """Ejecuta el proceso por un tiempo determinado"""
+    def execute(self, time_slice=1, now=0):
+        """Ejecuta el proceso por un tiempo determinado a partir del instante now"""
         if self.state != ProcessState.RUNNING:
             self.state = ProcessState.RUNNING
-            if not self.start_time:
-                self.start_time = time.time()
+            if self.start_time is None:
+                self.start_time = now
 
         executed_time = min(time_slice, self.remaining_time)
         self.remaining_time -= executed_time
 
         if self.remaining_time <= 0:
-            self.state = ProcessState.TERMINATED
-            self.turnaround_time = time.time() - self.start_time
+            if self.bursts:
+                # Fin de la ráfaga de CPU: sigue una de E/S
+                self.state = ProcessState.WAITING
+            else:
+                self.state = ProcessState.TERMINATED
+                arrival = self.start_time if self.arrival_time is None else self.arrival_time
+                self.turnaround_time = now + executed_time - arrival
 
         return executed_time
 
+    def fork(self, pid=None):
+        """
+        Crea un proceso hijo con lo que le queda al padre: ráfagas, prioridad,
+        tamaño de memoria y afinidad. La memoria se clona aparte con
+        MemoryManager.fork.
+        """
+        child = Process(self.name, self.remaining_time, self.priority, self.memory_size, pid,
+                        self.bursts)
+        if self.affinity is not None:
+            child.affinity = set(self.affinity)
+        return child
+
     def __str__(self):
         return f"Proceso {self.pid}: {self.name} ({self.state.value})"
 
+# Códigos de estado para las tablas compactas
+STATES = tuple(ProcessState)
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+class ProcessTable:
+    """
+    Tabla de procesos en estructura de arrays: cada campo es un array tipado
+    (unos 65 bytes por proceso frente a los ~430 de un objeto Process).
+    Los campos poco usados (nombre, afinidad, páginas) se guardan solo para
+    los procesos que los tienen. Los PIDs se toman del PIDAllocator indicado
+    o, si no se indica ninguno, de uno propio de la tabla.
+    """
+    PID_MAX = 1 << 22  # Tamaño del asignador propio (el máximo de Linux)
+    NONE = -1  # Valor de los campos opcionales sin asignar
+
+    def __init__(self, pids=None):
+        self.pids = pids if pids is not None else PIDAllocator(self.PID_MAX)
+        self.sorted_pids = True  # Permite buscar PIDs por búsqueda binaria
+        self.pid = array('i')
+        self.burst_time = array('i')
+        self.remaining_time = array('i')
+        self.priority = array('i')
+        self.memory_size = array('i')
+        self.state = array('b')
+        self.waiting_time = array('q')
+        self.turnaround_time = array('q')
+        self.arrival_time = array('q')
+        self.ready_since = array('q')
+        self.start_time = array('q')
+        self.last_core = array('i')
+        self.names = {}  # índice -> nombre (si no se indica se usa p<pid>)
+        self.affinity = {}  # índice -> núcleos permitidos
+        self.pages = {}  # índice -> lista de páginas
+        self.page_index = {}  # índice -> {page_id: Page}
+        # Una sola vista viva por fila, para que tabla[i] sea siempre el mismo proceso
+        self.views = WeakValueDictionary()
+
+    def extend(self, burst_times, priorities=None, memory_size=0):
+        """
+        Añade un proceso por ráfaga y devuelve el rango de índices creados
+        (None si el asignador de PIDs no tiene suficientes libres).
+        """
+        first = len(self.pid)
+        bursts = array('i', burst_times)
+        n = len(bursts)
+        pids = self.pids.allocate_many(n)
+        if pids is None:
+            return None
+        if self.sorted_pids and n:
+            last = self.pid[-1] if self.pid else 0
+            self.sorted_pids = last < pids[0] and \
+                all(a < b for a, b in zip(pids, islice(pids, 1, None)))
+        self.pid.extend(pids)
+        self.burst_time.extend(bursts)
+        self.remaining_time.extend(bursts)
+        self.priority.extend(array('i', priorities) if priorities is not None
+                             else array('i', bytes(4 * n)))
+        self.memory_size.extend(array('i', [memory_size]) * n)
+        self.state.extend(array('b', [STATE_CODES[ProcessState.NEW]]) * n)
+        zeros = array('q', bytes(8 * n))
+        self.waiting_time.extend(zeros)
+        self.turnaround_time.extend(zeros)
+        unset = array('q', [self.NONE]) * n
+        for column in (self.arrival_time, self.ready_since, self.start_time):
+            column.extend(unset)
+        self.last_core.extend(array('i', [self.NONE]) * n)
+        return range(first, first + n)
+
+    def add(self, name, burst_time, priority=0, memory_size=0):
+        """Añade un proceso y devuelve su vista (None si no quedan PIDs)"""
+        indices = self.extend((burst_time,), (priority,), memory_size)
+        if indices is None:
+            return None
+        index = indices[0]
+        if name is not None:
+            self.names[index] = name
+        return self[index]
+
+    def index_of(self, pid):
+        """Índice de un PID, o None si no existe"""
+        if not self.sorted_pids:
+            return self.pid.index(pid) if pid in self.pid else None
+        index = bisect_left(self.pid, pid)
+        if index < len(self.pid) and self.pid[index] == pid:
+            return index
+        return None
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.pid)
+        view = self.views.get(index)
+        if view is None:
+            view = self.views[index] = ProcessView(self, index)
+        return view
+
+    def __len__(self):
+        return len(self.pid)
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self.pid)))
+
+    def count_state(self, state):
+        return self.state.count(STATE_CODES[state])
+
+    def memory_bytes(self):
+        """Bytes ocupados por las columnas tipadas"""
+        columns = (self.pid, self.burst_time, self.remaining_time, self.priority,
+                   self.memory_size, self.state, self.waiting_time, self.turnaround_time,
+                   self.arrival_time, self.ready_since, self.start_time, self.last_core)
+        return sum(column.itemsize * len(column) for column in columns)
+
+def _column(name, optional=False):
+    """Propiedad de ProcessView respaldada por una columna de la tabla"""
+    def get(self):
+        value = getattr(self.table, name)[self.index]
+        return None if optional and value == ProcessTable.NONE else value
+
+    def set(self, value):
+        if optional and value is None:
+            value = ProcessTable.NONE
+        getattr(self.table, name)[self.index] = value
+    return property(get, set)
+
+def _sparse(name, default=None):
+    """Propiedad de ProcessView para un campo poco frecuente guardado en un diccionario"""
+    def get(self):
+        values = getattr(self.table, name)
+        if default is None:
+            return values.get(self.index)
+        return values.setdefault(self.index, default())
+
+    def set(self, value):
+        values = getattr(self.table, name)
+        if value is None:
+            values.pop(self.index, None)
+        else:
+            values[self.index] = value
+    return property(get, set)
+
+class ProcessView:
+    """
+    Vista ligera de una fila de ProcessTable con la misma interfaz que
+    Process, para usar la tabla con los planificadores existentes.
+    """
+    __slots__ = ('table', 'index', '__weakref__')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    pid = _column('pid')
+    burst_time = _column('burst_time')
+    remaining_time = _column('remaining_time')
+    priority = _column('priority')
+    memory_size = _column('memory_size')
+    waiting_time = _column('waiting_time')
+    turnaround_time = _column('turnaround_time')
+    arrival_time = _column('arrival_time', optional=True)
+    ready_since = _column('ready_since', optional=True)
+    start_time = _column('start_time', optional=True)
+    last_core = _column('last_core', optional=True)
+    affinity = _sparse('affinity')
+    bursts = None  # Las filas de la tabla tienen una única ráfaga de CPU
+    pages = _sparse('pages', list)
+    page_index = _sparse('page_index', dict)
+
+    @property
+    def name(self):
+        return self.table.names.get(self.index) or f"p{self.pid}"
+
+    @property
+    def state(self):
+        return STATES[self.table.state[self.index]]
+
+    @state.setter
+    def state(self, state):
+        self.table.state[self.index] = STATE_CODES[state]
+
+    # Misma lógica que Process.execute
+    execute = Process.execute
+    __str__ = Process.__str__
+
+class LevelQueues:
+    """
+    Colas FIFO por nivel con un mapa de bits de niveles no vacíos:
+    el nivel más alto con procesos se encuentra en O(1) con bit_length().
+    Cada cola guarda entradas [proceso]; al borrar un proceso su entrada
+    queda con None y se descarta al salir de la cola.
+    """
+    def __init__(self, levels):
+        self.queues = [deque() for _ in range(levels)]
+        self.bitmap = 0
+        self.entries = {}  # proceso -> su entrada viva
+
+    def push(self, level, process):
+        entry = [process]
+        self.entries[process] = entry
+        self.queues[level].append(entry)
+        self.bitmap |= 1 << level
+
+    def pop_highest(self):
+        """Saca el primer proceso del nivel más alto no vacío"""
+        while self.bitmap:
+            level = self.bitmap.bit_length() - 1
+            queue = self.queues[level]
+            process = queue.popleft()[0]
+            if not queue:
+                self.bitmap &= ~(1 << level)
+            if process is not None:
+                del self.entries[process]
+                return level, process
+        return None, None
+
+    def remove(self, process):
+        entry = self.entries.pop(process, None)
+        if entry is None:
+            return False
+        entry[0] = None
+        return True
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        for level in range(len(self.queues) - 1, -1, -1):
+            for entry in self.queues[level]:
+                if entry[0] is not None:
+                    yield entry[0]
+
 class Scheduler:
     """Clase base para los planificadores"""
-    def __init__(self):
+    name = "Base"
+
+    def __init__(self, clock=None, memory=None, engine=None, pids=None):
         self.ready_queue = deque()
         self.running_process = None
-        self.waiting_queue = deque()
+        self.waiting_queue = {}  # Procesos bloqueados en E/S (diccionario ordenado)
+        self.blocked = {}  # Procesos bloqueados con block (p. ej. en un semáforo)
+        self.devices = {}  # nombre -> dispositivo para las ráfagas de E/S
+        self.io_engine = engine  # Motor de eventos de los dispositivos
+        self.replaced_by = None  # Planificador que tomó los procesos tras un cambio
         self.terminated_processes = []
-        self.current_time = 0
+        self.clock = clock or (engine.clock if engine is not None else SimulationClock())
+        self.memory = memory  # Gestor de memoria al que devolver los marcos
+        # Asignador de los PIDs de los procesos admitidos sin PID (propio si no
+        # se indica ninguno) y al que se devuelven al terminar
+        self.pids = pids if pids is not None else PIDAllocator(ProcessTable.PID_MAX)
+        # Con motor de eventos la CPU avanza por eventos de fin de porción
+        # en lugar de llamadas a execute_step
+        self.engine = engine
+        self._cpu_event = None
+        self._slice_start = 0
+        self.context_switches = 0
+        self.last_dispatched = None
+        # Identificador y contadores del núcleo (varían en multinúcleo)
+        self.core_id = 0
+        self.busy_time = 0
+        self.migrations = 0
+        self.balancer = None  # Planificador multinúcleo al que pedir trabajo
+
+    @property
+    def current_time(self):
+        return self.clock.now
 
     def add_process(self, process):
-        process.state = ProcessState.READY
+        self._mark_ready(process)
         self.ready_queue.append(process)
 
     def get_next_process(self):
         raise NotImplementedError
 
-    def update_waiting_times(self):
-        for process in self.ready_queue:
-            process.waiting_time += 1
+    def _mark_ready(self, process):
+        """Pasa un proceso a listo y anota desde cuándo espera"""
+        if process.arrival_time is None:
+            self._check_devices(process)
+            if process.pid is None:
+                process.pid = self.pids.allocate()
+                if process.pid is None:
+                    raise ValueError(f"No quedan PIDs libres (pid_max={self.pids.pid_max})")
+            process.arrival_time = self.clock.now
+        process.state = ProcessState.READY
+        if process.ready_since is None:
+            process.ready_since = self.clock.now
+        if self.balancer is not None:
+            self.balancer.owner[process] = self
+        self._wake(process)
+
+    def _check_devices(self, process):
+        """Al admitir un proceso: cada ráfaga de E/S debe tener dispositivo registrado"""
+        for name, _ in process.bursts or ():
+            if name != "CPU" and name not in self.devices:
+                raise ValueError(f"Dispositivo de E/S no registrado: {name}")
+
+    def _account_wait(self, process):
+        """Suma al tiempo de espera lo transcurrido desde que el proceso quedó listo"""
+        if process is not None and process.ready_since is not None:
+            process.waiting_time += self.clock.now - process.ready_since
+            process.ready_since = None
+        return process
+
+    def waiting_time(self, process):
+        """Tiempo de espera acumulado, incluida la espera en curso"""
+        if process.ready_since is None:
+            return process.waiting_time
+        return process.waiting_time + self.clock.now - process.ready_since
+
+    def ready_processes(self):
+        """Procesos listos en el orden en que serían elegidos"""
+        return list(self.ready_queue)
+
+    def ready_count(self):
+        """Número de procesos en la cola de listos"""
+        return len(self.ready_queue)
+
+    def running_processes(self):
+        """Procesos que ocupan una CPU"""
+        return [self.running_process] if self.running_process else []
+
+    def migrate_from(self, other):
+        """Toma los procesos de otro planificador (al cambiar de algoritmo)"""
+        other._stop_cpu()
+        pending = [p for p in other.running_processes() if p.state != ProcessState.TERMINATED]
+        for process in pending + other.ready_processes():
+            self.add_process(process)
+        self.waiting_queue = other.waiting_queue
+        self.blocked = other.blocked
+        self.terminated_processes = other.terminated_processes
+        self.devices = other.devices
+        self.pids = other.pids
+        if self.io_engine is None:
+            self.io_engine = other.io_engine
+        other.replaced_by = self
+
+    def _finish(self, process):
+        """Registra un proceso terminado y libera su memoria"""
+        self.terminated_processes.append(process)
+        if self.memory is not None:
+            self.memory.free_process(process.pid)
+        self.pids.release(process.pid)
+        if self.balancer is not None:
+            self.balancer.owner.pop(process, None)
+
+    def terminate_process(self, process):
+        """Termina un proceso desde fuera del planificador"""
+        if process.state == ProcessState.TERMINATED:
+            return False
+        self.waiting_queue.pop(process, None)
+        self.blocked.pop(process, None)
+        if process is self.running_process:
+            self.running_process = None
+            if self._cpu_event is not None:
+                # Anula el fin de su porción de CPU y libera la CPU
+                self.engine.cancel(self._cpu_event)
+                self._cpu_event = None
+                self._wake()
+        else:
+            self._remove_ready(process)
+            self._account_wait(process)
+        process.state = ProcessState.TERMINATED
+        self._finish(process)
+        return True
+
+    def block(self, process):
+        """
+        Bloquea un proceso (p. ej. en un semáforo): sale de la cola de listos
+        y no vuelve a ocupar la CPU hasta que se llame a unblock.
+        """
+        if self.replaced_by is not None:
+            return self.replaced_by.block(process)
+        if process.state in (ProcessState.TERMINATED, ProcessState.WAITING):
+            return False  # Terminado, o ya esperando (E/S u otro bloqueo)
+        if process is self.running_process:
+            # Acredita lo ya ejecutado de su porción y libera la CPU
+            self._stop_cpu()
+            if self.running_process is None:
+                return False  # Terminó su ráfaga justo al interrumpirse
+            self.running_process = None
+            self._wake()
+        else:
+            self._remove_ready(process)
+            self._account_wait(process)
+        process.state = ProcessState.WAITING
+        self.blocked[process] = None
+        return True
+
+    def unblock(self, process):
+        """Devuelve a la cola de listos un proceso bloqueado con block"""
+        if self.replaced_by is not None:
+            return self.replaced_by.unblock(process)
+        if process not in self.blocked:
+            return False
+        del self.blocked[process]
+        (self.balancer or self).add_process(process)
+        return True
+
+    def _remove_ready(self, process):
+        """Saca un proceso de la cola de listos (si está en ella)"""
+        if process in self.ready_queue:
+            self.ready_queue.remove(process)
+
+    def steal(self, core_id, scan=32):
+        """
+        Cede a otro núcleo un proceso listo que pueda ejecutarse en él,
+        revisando como mucho scan candidatos desde el final de la cola.
+        """
+        for process in islice(self._steal_candidates(), scan):
+            allowed = self.balancer.allowed_mask(process)
+            if allowed is None or allowed >> core_id & 1:
+                self._remove_ready(process)
+                return self._account_wait(process)
+        return None
+
+    def _steal_candidates(self):
+        return reversed(self.ready_queue)
+
+    def _time_slice(self, process):
+        """Tiempo de CPU que se concede al proceso en cada despacho"""
+        return process.remaining_time
+
+    def _dispatch(self):
+        """Devuelve el proceso que ocupa la CPU, eligiendo uno si está libre"""
+        if not self.running_process:
+            process = self.get_next_process()
+            if process is None and self.balancer is not None:
+                process = self.balancer.steal_for(self)
+            if process is not None:
+                if process is not self.last_dispatched:
+                    if self.last_dispatched is not None:
+                        self.context_switches += 1
+                    self.last_dispatched = process
+                if process.last_core is not None and process.last_core != self.core_id:
+                    self.migrations += 1
+                process.last_core = self.core_id
+            self.running_process = process
+        return self.running_process
+
+    def _slice_done(self, process, executed_time):
+        """Tras una porción de CPU: termina el proceso, pasa a E/S o vuelve a listos"""
+        if process.state == ProcessState.TERMINATED:
+            self._finish(process)
+        elif process.state == ProcessState.WAITING:
+            self._start_io(process)
+        elif not self._runs_here(process):
+            # Su afinidad cambió: el balanceador lo lleva a un núcleo permitido
+            self.balancer.add_process(process)
+        else:
+            self.add_process(process)
+        self.running_process = None
+
+    def _runs_here(self, process):
+        """Si la afinidad del proceso permite este núcleo (siempre sin balanceador)"""
+        if self.balancer is None:
+            return True
+        allowed = self.balancer.allowed_mask(process)
+        return allowed is None or bool(allowed >> self.core_id & 1)
+
+    def attach_device(self, name, device):
+        """
+        Registra un dispositivo para las ráfagas de E/S con ese nombre, antes
+        de añadir procesos que lo usen ("CPU" está reservado). El dispositivo
+        debe usar el motor de eventos del planificador (o, si el planificador
+        avanza por pasos, el mismo motor que los demás).
+        """
+        engine = device.engine
+        if name == "CPU" or engine is None or engine.clock is not self.clock:
+            return False
+        if self.io_engine is not None and engine is not self.io_engine:
+            return False
+        self.io_engine = engine
+        self.devices[name] = device
+        return True
+
+    def _start_io(self, process):
+        """Envía la siguiente ráfaga de E/S del proceso a su dispositivo"""
+        name, argument = process.bursts.popleft()
+        process.state = ProcessState.WAITING
+        self.waiting_queue[process] = None
+        self.devices[name].submit(process, argument, lambda: self._io_done(process))
+
+    def _io_done(self, process):
+        """Fin de una ráfaga de E/S: el proceso sigue con su siguiente ráfaga"""
+        if self.replaced_by is not None:
+            return self.replaced_by._io_done(process)
+        if process not in self.waiting_queue:
+            return  # Terminado mientras esperaba
+        del self.waiting_queue[process]
+        bursts = process.bursts
+        if bursts and bursts[0][0] != "CPU":
+            self._start_io(process)
+        elif bursts:
+            process.remaining_time = bursts.popleft()[1]
+            (self.balancer or self).add_process(process)
+        else:
+            # La última ráfaga era de E/S
+            process.state = ProcessState.TERMINATED
+            process.turnaround_time = self.clock.now - process.arrival_time
+            self._finish(process)
+
+    def execute_step(self):
+        """Ejecuta una porción de CPU y avanza el reloj lo que haya durado"""
+        process = self._dispatch()
+        if process is None:
+            # Sin procesos listos: salta a la siguiente finalización de E/S
+            return bool(self.waiting_queue) and self.io_engine is not None and \
+                self.io_engine.step()
+        executed_time = process.execute(self._time_slice(process), self.clock.now)
+        if self.io_engine is not None:
+            # La E/S avanza en paralelo durante la porción de CPU
+            self.io_engine.run(until=self.clock.now + executed_time)
+        else:
+            self.clock.tick(executed_time)
+        self.busy_time += executed_time
+        if process is self.running_process:  # Pudo terminarse desde fuera entretanto
+            self._slice_done(process, executed_time)
+        return True
+
+    def run(self, until=None, max_steps=None):
+        """
+        Ejecuta sin interrupciones hasta vaciar las colas, llegar al instante
+        until o completar max_steps porciones (eventos con motor de eventos) y
+        devuelve un resumen de los procesos terminados durante la ejecución.
+        """
+        start_time = self.clock.now
+        first = len(self.terminated_processes)
+        switches = self._switch_count()
+        cpu_busy = self._cpu_busy()
+        io_busy = self._io_busy()
+
+        if self.engine is not None:
+            steps = self.engine.run(until, max_steps)
+        else:
+            steps = 0
+            execute_step = self.execute_step
+            clock = self.clock
+            while max_steps is None or steps < max_steps:
+                if until is not None and clock.now >= until:
+                    break
+                if not execute_step():
+                    break
+                steps += 1
+
+        elapsed = self.clock.now - start_time
+        summary = self._summary(self.terminated_processes[first:], elapsed,
+                                steps, self._switch_count() - switches)
+        # Si cpu_busy_time + io_busy_time supera elapsed_time, la CPU y la E/S se solaparon
+        summary['cpu_busy_time'] = self._cpu_busy() - cpu_busy
+        summary['io_busy_time'] = self._io_busy() - io_busy
+        summary['cpu_utilization'] = (summary['cpu_busy_time'] / (elapsed * self._cpu_count())
+                                      if elapsed > 0 else 0)
+        summary['io_utilization'] = (summary['io_busy_time'] / (elapsed * len(self.devices))
+                                     if elapsed > 0 and self.devices else 0)
+        return summary
+
+    def _switch_count(self):
+        return self.context_switches
+
+    def _cpu_count(self):
+        return 1
+
+    def _cpu_busy(self):
+        return self.busy_time
+
+    def _io_busy(self):
+        return sum(device.busy_time for device in self.devices.values())
+
+    def _summary(self, finished, elapsed, steps, switches):
+        """Métricas agregadas de un conjunto de procesos terminados"""
+        # Los procesos terminados a la fuerza no cuentan como completados
+        completed = [p for p in finished if p.remaining_time <= 0 and not p.bursts]
+        waiting = sorted(p.waiting_time for p in completed)
+        turnaround = sorted(p.turnaround_time for p in completed)
+        summary = {
+            'completed': len(completed),
+            'elapsed_time': elapsed,
+            'steps': steps,
+            'throughput': len(completed) / elapsed if elapsed > 0 else 0,
+            'context_switches': switches,
+        }
+        for metric, values in (('waiting', waiting), ('turnaround', turnaround)):
+            summary[f'avg_{metric}_time'] = sum(values) / len(values) if values else 0
+            for p in (50, 95, 99):
+                summary[f'p{p}_{metric}_time'] = percentile(values, p)
+        return summary
+
+    def _wake(self, process=None):
+        """Con motor de eventos, programa un despacho si la CPU está libre"""
+        if self.engine is None:
+            return
+        if self._cpu_event is None:
+            self._cpu_event = self.engine.schedule(self.clock.now, self._start_slice)
+            if self.balancer is not None:
+                self.balancer.core_busy(self)
+        elif self.balancer is not None and process is not None:
+            # CPU ocupada: otro núcleo ocioso puede robar el proceso recién encolado
+            self.balancer.wake_idle(self, process)
+
+    def _start_slice(self):
+        """Evento de despacho: elige proceso y programa el fin de su porción"""
+        process = self._dispatch()
+        if process is None:
+            self._cpu_event = None
+            if self.balancer is not None:
+                self.balancer.core_idle(self)
+            return
+        process.state = ProcessState.RUNNING
+        if process.start_time is None:
+            process.start_time = self.clock.now
+        executed_time = min(self._time_slice(process), process.remaining_time)
+        self._slice_start = self.clock.now
+        self._cpu_event = self.engine.schedule_in(executed_time, self._end_slice,
+                                                  process, executed_time)
+        if self.balancer is not None and self.ready_count():
+            self.balancer.offer(self)
+
+    def _end_slice(self, process, executed_time):
+        """Evento de fin de porción: el proceso terminó o agotó su quantum"""
+        process.execute(executed_time, self._slice_start)
+        self.busy_time += executed_time
+        self._slice_done(process, executed_time)
+        self._start_slice()
+
+    def _stop_cpu(self):
+        """Interrumpe la porción en curso acreditando el tiempo ya ejecutado"""
+        if self._cpu_event is None:
+            return
+        self.engine.cancel(self._cpu_event)
+        self._cpu_event = None
+        process = self.running_process
+        if process is not None:
+            executed_time = self.clock.now - self._slice_start
+            process.execute(executed_time, self._slice_start)
+            self.busy_time += executed_time
+            if process.state == ProcessState.TERMINATED:
+                self._finish(process)
+                self.running_process = None
+            elif process.state == ProcessState.WAITING:
+                self._start_io(process)  # Acabó su ráfaga de CPU justo ahora
+                self.running_process = None
 
 class RoundRobinScheduler(Scheduler):
     """Implementación del algoritmo Round Robin"""
-    def __init__(self, quantum=2):
-        super().__init__()
+    name = "Round Robin"
+
+    def __init__(self, quantum=2, clock=None, memory=None, engine=None, pids=None):
+        super().__init__(clock, memory, engine, pids)
         self.quantum = quantum
 
     def get_next_process(self):
         if not self.ready_queue:
             return None
-        return self.ready_queue.popleft()
+        return self._account_wait(self.ready_queue.popleft())
 
-    def execute_step(self):
-        if not self.running_process:
-            self.running_process = self.get_next_process()
+    def _time_slice(self, process):
+        return self.quantum
 
-        if self.running_process:
-            executed_time = self.running_process.execute(self.quantum)
-            self.current_time += executed_time
-            self.update_waiting_times()
+class SJFScheduler(Scheduler):
+    """Implementación del algoritmo Shortest Job First"""
+    name = "SJF"
 
-            if self.running_process.state == ProcessState.TERMINATED:
-                self.terminated_processes.append(self.running_process)
-                self.running_process = None
-            else:
-                self.ready_queue.append(self.running_process)
-                self.running_process = None
+    def __init__(self, clock=None, memory=None, engine=None, pids=None):
+        super().__init__(clock, memory, engine, pids)
+        # Montículo de [tiempo restante, orden de llegada, proceso]: los
+        # empates se resuelven en orden FIFO. Las entradas borradas quedan con
+        # proceso None y se descartan al salir del montículo
+        self.ready_queue = []
+        self.entries = {}  # proceso -> su entrada en el montículo
+        self.arrival_order = count()
 
-            return True
-        return False
+    def add_process(self, process):
+        self._mark_ready(process)
+        entry = [process.remaining_time, next(self.arrival_order), process]
+        self.entries[process] = entry
+        heapq.heappush(self.ready_queue, entry)
 
-class SJFScheduler(Scheduler):
-    """Implementación del algoritmo Shortest Job First"""
     def get_next_process(self):
-        if not self.ready_queue:
+        queue = self.ready_queue
+        while queue:
+            process = heapq.heappop(queue)[2]
+            if process is not None:
+                del self.entries[process]
+                return self._account_wait(process)
+        return None
+
+    def ready_processes(self):
+        return [entry[2] for entry in sorted(self.ready_queue) if entry[2] is not None]
+
+    def ready_count(self):
+        return len(self.entries)
+
+    def _remove_ready(self, process):
+        entry = self.entries.pop(process, None)
+        if entry is None:
+            return
+        entry[2] = None
+        if len(self.ready_queue) > 2 * len(self.entries) + 64:
+            # Compactar para que las entradas borradas no se acumulen
+            self.ready_queue = [e for e in self.ready_queue if e[2] is not None]
+            heapq.heapify(self.ready_queue)
+
+    def _steal_candidates(self):
+        # Las hojas del montículo tienden a ser los trabajos más largos
+        return (entry[2] for entry in reversed(self.ready_queue) if entry[2] is not None)
+
+    def _time_slice(self, process):
+        # No expropiativo: paso a paso avanza de unidad en unidad, y con motor
+        # de eventos la ráfaga completa es un único evento
+        return process.remaining_time if self.engine is not None else 1
+
+    def _slice_done(self, process, executed_time):
+        # El proceso conserva la CPU hasta terminar su ráfaga
+        if process.state == ProcessState.TERMINATED:
+            self._finish(process)
+            self.running_process = None
+        elif process.state == ProcessState.WAITING:
+            self._start_io(process)
+            self.running_process = None
+        elif not self._runs_here(process):
+            self.running_process = None
+            self.balancer.add_process(process)
+
+class PriorityScheduler(Scheduler):
+    """
+    Planificación por prioridades con Round Robin dentro de cada nivel.
+    Mayor valor de Process.priority significa mayor prioridad.
+    """
+    name = "Prioridades"
+
+    def __init__(self, quantum=2, levels=32, clock=None, memory=None, engine=None,
+                 pids=None):
+        super().__init__(clock, memory, engine, pids)
+        self.quantum = quantum
+        self.levels = levels
+        self.ready_queue = LevelQueues(levels)
+
+    def _level(self, process):
+        return min(max(process.priority, 0), self.levels - 1)
+
+    def add_process(self, process):
+        self._mark_ready(process)
+        self.ready_queue.push(self._level(process), process)
+
+    def get_next_process(self):
+        return self._account_wait(self.ready_queue.pop_highest()[1])
+
+    def _remove_ready(self, process):
+        self.ready_queue.remove(process)
+
+    def _time_slice(self, process):
+        return self.quantum
+
+class MLFQScheduler(Scheduler):
+    """
+    Colas multinivel con retroalimentación: los procesos nuevos entran en el
+    nivel más alto, bajan de nivel al agotar su quantum y cada boost_interval
+    unidades de tiempo todos vuelven al nivel más alto (evita la inanición).
+    """
+    name = "MLFQ"
+
+    def __init__(self, quanta=(2, 4, 8), boost_interval=50, clock=None, memory=None,
+                 engine=None, pids=None):
+        super().__init__(clock, memory, engine, pids)
+        self.quanta = list(quanta)
+        self.boost_interval = boost_interval
+        self.ready_queue = LevelQueues(len(self.quanta))
+        self.levels = {}  # pid -> nivel (0 es el más prioritario)
+        self.last_boost = self.clock.now
+
+    def _push(self, process):
+        # En el mapa de bits el nivel 0 ocupa el bit más alto
+        level = self.levels.setdefault(process.pid, 0)
+        self.ready_queue.push(len(self.quanta) - 1 - level, process)
+
+    def add_process(self, process):
+        self._mark_ready(process)
+        self._push(process)
+
+    def get_next_process(self):
+        return self._account_wait(self.ready_queue.pop_highest()[1])
+
+    def _remove_ready(self, process):
+        self.ready_queue.remove(process)
+
+    def _finish(self, process):
+        self.levels.pop(process.pid, None)
+        super()._finish(process)
+
+    def _boost(self):
+        """Devuelve todos los procesos listos al nivel más alto"""
+        pending = list(self.ready_queue)
+        self.ready_queue = LevelQueues(len(self.quanta))
+        for process in pending:
+            self.levels[process.pid] = 0
+            self._push(process)
+        self.last_boost = self.clock.now
+
+    def _dispatch(self):
+        if self.clock.now - self.last_boost >= self.boost_interval:
+            self._boost()
+        return super()._dispatch()
+
+    def _time_slice(self, process):
+        return self.quanta[self.levels.setdefault(process.pid, 0)]
+
+    def _slice_done(self, process, executed_time):
+        level = self.levels.get(process.pid, 0)
+        if process.state == ProcessState.RUNNING and executed_time >= self.quanta[level]:
+            # Agotó su quantum: baja un nivel
+            self.levels[process.pid] = min(level + 1, len(self.quanta) - 1)
+        super()._slice_done(process, executed_time)
+
+class MultiCoreScheduler(Scheduler):
+    """
+    Planificador SMP: cada núcleo tiene su propia cola de listos (Round Robin
+    o SJF) y avanza en paralelo sobre un motor de eventos compartido. Un núcleo
+    sin trabajo roba procesos de la cola de otro; Process.affinity limita los
+    núcleos en los que puede ejecutarse cada proceso. El coste de cada
+    despacho no depende del número de núcleos: los ociosos se buscan en un
+    mapa de bits y un robo revisa como mucho STEAL_PROBES colas.
+    """
+    POLICIES = ("RR", "SJF")
+    STEAL_PROBES = 4  # Colas elegidas al azar que revisa un núcleo al robar
+
+    def __init__(self, cores=4, policy="RR", quantum=2, clock=None, memory=None,
+                 engine=None, pids=None, seed=0):
+        engine = engine if engine is not None else EventEngine(clock)
+        super().__init__(engine.clock, memory, engine, pids)
+        self.name = f"Multinúcleo ({cores} x {policy})"
+        self.policy = policy
+        self.quantum = quantum
+        self.cores = []
+        for core_id in range(cores):
+            if policy == "SJF":
+                core = SJFScheduler(memory=memory, engine=engine, pids=self.pids)
+            else:
+                core = RoundRobinScheduler(quantum, memory=memory, engine=engine,
+                                           pids=self.pids)
+            core.core_id = core_id
+            core.balancer = self
+            core.terminated_processes = self.terminated_processes
+            core.waiting_queue = self.waiting_queue
+            core.blocked = self.blocked
+            core.devices = self.devices
+            self.cores.append(core)
+        self.idle_mask = (1 << cores) - 1  # Bit i: el núcleo i está ocioso
+        self.owner = {}  # proceso -> núcleo en cuya cola está (o que lo ejecuta)
+        self.hints = {}  # núcleo despertado -> núcleo del que debe robar primero
+        self.placement = count()
+        self.rng = random.Random(seed)
+        self.steals = 0
+        self.start_time = self.clock.now
+
+    def add_process(self, process):
+        """
+        Encola el proceso en un núcleo ocioso permitido; si no hay, en su
+        último núcleo o en turno rotatorio entre los permitidos.
+        """
+        if process.arrival_time is None:
+            self._check_devices(process)  # Antes de reservar un núcleo ocioso
+        allowed = self.allowed_mask(process)
+        core = self._idle_core(allowed)
+        if core is None:
+            core_id = process.last_core
+            if core_id is None or core_id >= len(self.cores) or \
+                    (allowed is not None and not allowed >> core_id & 1):
+                if allowed is None:
+                    core_id = next(self.placement) % len(self.cores)
+                else:
+                    candidates = sorted(c for c in process.affinity if allowed >> c & 1)
+                    core_id = candidates[next(self.placement) % len(candidates)]
+            core = self.cores[core_id]
+        core.add_process(process)
+
+    def allowed_mask(self, process):
+        """
+        Máscara de bits de los núcleos permitidos por la afinidad del proceso
+        (None si son todos). Se ignoran los núcleos que no existen.
+        """
+        if process.affinity is None:
+            return None
+        mask = 0
+        for core_id in process.affinity:
+            if 0 <= core_id < len(self.cores):
+                mask |= 1 << core_id
+        return mask or None
+
+    def _idle_core(self, allowed):
+        """Reserva el núcleo ocioso permitido de menor número (o None)"""
+        idle = self.idle_mask if allowed is None else self.idle_mask & allowed
+        if not idle:
             return None
-        
-        shortest_job = min(self.ready_queue, key=lambda p: p.remaining_time)
-        self.ready_queue.remove(shortest_job)
-        return shortest_job
+        core_id = (idle & -idle).bit_length() - 1
+        self.idle_mask &= ~(1 << core_id)
+        return self.cores[core_id]
+
+    def steal_for(self, thief):
+        """
+        Roba para un núcleo ocioso un proceso de la cola de otro: primero del
+        núcleo que lo despertó (si lo hubo) y luego de unos pocos al azar.
+        """
+        victims = []
+        hint = self.hints.pop(thief, None)
+        if hint is not None:
+            victims.append(hint)
+        n = len(self.cores)
+        for _ in range(min(self.STEAL_PROBES, n - 1)):
+            i = self.rng.randrange(n - 1)
+            victims.append(self.cores[i + (i >= thief.core_id)])
+        for victim in victims:
+            if victim is thief or not victim.ready_count():
+                continue
+            process = victim.steal(thief.core_id)
+            if process is not None:
+                self.steals += 1
+                self.owner[process] = thief
+                return process
+        return None
+
+    def _send_idle(self, core, allowed):
+        """Despierta un núcleo ocioso permitido para que robe de la cola de core"""
+        idle = self._idle_core(allowed)
+        if idle is None:
+            return False
+        self.hints[idle] = core
+        idle._wake()
+        return True
+
+    def offer(self, core):
+        """Un núcleo ocupado con procesos en cola despierta núcleos ociosos para que roben"""
+        for _ in range(min(self.STEAL_PROBES, core.ready_count())):
+            if not self._send_idle(core, None):
+                return
+
+    def core_idle(self, core):
+        self.idle_mask |= 1 << core.core_id
+
+    def core_busy(self, core):
+        self.idle_mask &= ~(1 << core.core_id)
+
+    def wake_idle(self, core, process):
+        """Despierta un núcleo ocioso en el que pueda ejecutarse el proceso recién encolado"""
+        self._send_idle(core, self.allowed_mask(process))
 
     def execute_step(self):
-        if not self.running_process:
-            self.running_process = self.get_next_process()
+        """Procesa el siguiente evento de cualquiera de los núcleos"""
+        return self.engine.step()
 
-        if self.running_process:
-            executed_time = self.running_process.execute()
-            self.current_time += executed_time
-            self.update_waiting_times()
+    def ready_processes(self):
+        return [p for core in self.cores for p in core.ready_processes()]
 
-            if self.running_process.state == ProcessState.TERMINATED:
-                self.terminated_processes.append(self.running_process)
-                self.running_process = None
+    def running_processes(self):
+        return [p for core in self.cores for p in core.running_processes()]
 
-            return True
-        return False 
\ No newline at end of file
+    def terminate_process(self, process):
+        return self.owner.get(process, self.cores[0]).terminate_process(process)
+
+    def block(self, process):
+        if self.replaced_by is not None:
+            return self.replaced_by.block(process)
+        return self.owner.get(process, self.cores[0]).block(process)
+
+    def migrate_from(self, other):
+        super().migrate_from(other)
+        for core in self.cores:
+            core.waiting_queue = self.waiting_queue
+            core.blocked = self.blocked
+            core.terminated_processes = self.terminated_processes
+            core.devices = self.devices
+            core.pids = self.pids
+
+    def _stop_cpu(self):
+        for core in self.cores:
+            core._stop_cpu()
+
+    def _switch_count(self):
+        return sum(core.context_switches for core in self.cores)
+
+    def _cpu_count(self):
+        return len(self.cores)
+
+    def _cpu_busy(self):
+        return sum(core.busy_time for core in self.cores)
+
+    def get_statistics(self):
+        """Utilización, migraciones y longitud de cola de cada núcleo"""
+        elapsed = self.clock.now - self.start_time
+        return {
+            'cores': [{
+                'core': core.core_id,
+                'busy_time': core.busy_time,
+                'utilization': core.busy_time / elapsed if elapsed > 0 else 0,
+                'queue_length': core.ready_count(),
+                'migrations': core.migrations,
+            } for core in self.cores],
+            'migrations': sum(core.migrations for core in self.cores),
+            'steals': self.steals,
+        }
\ No newline at end of file
@@ -2,49 +2,104 @@
 from collections import deque
 from process import ProcessState
 
+class Continuations:
+    """
+    Continuaciones de procesos despertados, compartidas por los semáforos de
+    un mismo problema: se ejecutan en un bucle y no anidadas, aunque cada una
+    despierte a otro proceso (p. ej. una cadena de lectores que esperaban al
+    escritor).
+    """
+    def __init__(self):
+        self.pending = deque()
+        self.draining = False
+
+    def run(self, action):
+        """Ejecuta action, o la encola si ya se está ejecutando otra"""
+        self.pending.append(action)
+        if self.draining:
+            return
+        self.draining = True
+        try:
+            while self.pending:
+                self.pending.popleft()()
+        finally:
+            self.draining = False
+
 class Semaphore:
-    """Implementación de un semáforo"""
-    def __init__(self, initial_value=1):
+    """
+    Implementación de un semáforo. Si se le pasa un planificador, los procesos
+    que esperan se bloquean en él (salen de la cola de listos) y signal los
+    devuelve a la cola automáticamente.
+    """
+    def __init__(self, initial_value=1, scheduler=None, continuations=None):
         self.value = initial_value
         self.waiting_queue = deque()
-
-    def wait(self, process):
-        """Operación P (wait)"""
+        self.scheduler = scheduler
+        self.resumes = {}  # proceso -> acción pendiente hasta que lo despierten
+        self.continuations = continuations or Continuations()
+
+    def wait(self, process, resume=None):
+        """
+        Operación P (wait). Si el proceso tiene que esperar, resume se ejecuta
+        cuando signal lo despierte (ya con el semáforo tomado). Sin proceso
+        (process=None) solo se intenta, sin esperar. Un proceso terminado o
+        que ya está esperando no puede hacer wait.
+        """
+        if process is not None and \
+                process.state in (ProcessState.TERMINATED, ProcessState.WAITING):
+            return False
         if self.value > 0:
             self.value -= 1
             return True
-        else:
-            process.state = ProcessState.WAITING
-            self.waiting_queue.append(process)
+        if process is None:
             return False
+        if self.scheduler is None or not self.scheduler.block(process):
+            process.state = ProcessState.WAITING
+        self.waiting_queue.append(process)
+        if resume is not None:
+            self.resumes[process] = resume
+        return False
+
+    def wait_then(self, process, action):
+        """Ejecuta action con el semáforo tomado: ahora, o al despertar el proceso"""
+        if self.wait(process, action):
+            return action()
+        return False
 
     def signal(self):
         """Operación V (signal)"""
-        if self.waiting_queue:
+        while self.waiting_queue:
             process = self.waiting_queue.popleft()
-            process.state = ProcessState.READY
+            resume = self.resumes.pop(process, None)
+            if process.state == ProcessState.TERMINATED:
+                continue  # Terminado mientras esperaba
+            if self.scheduler is None or not self.scheduler.unblock(process):
+                process.state = ProcessState.READY
+            if resume is not None:
+                self.continuations.run(resume)
             return process
-        else:
-            self.value += 1
-            return None
+        self.value += 1
+        return None
 
 class ProducerConsumer:
     """Implementación del problema productor-consumidor"""
-    def __init__(self, buffer_size=5):
+    def __init__(self, buffer_size=5, scheduler=None):
         self.buffer = deque(maxlen=buffer_size)
-        self.mutex = Semaphore(1)
-        self.empty = Semaphore(buffer_size)
-        self.full = Semaphore(0)
+        continuations = Continuations()
+        self.mutex = Semaphore(1, scheduler, continuations)
+        self.empty = Semaphore(buffer_size, scheduler, continuations)
+        self.full = Semaphore(0, scheduler, continuations)
         self.history = []
 
     def produce(self, producer, item):
-        """Produce un item"""
-        if not self.empty.wait(producer):
-            return False
-
-        if not self.mutex.wait(producer):
-            return False
-
+        """
+        Produce un item. Si el buffer está lleno devuelve False y el productor
+        queda bloqueado; el item se añade en cuanto un consumidor deje hueco.
+        """
+        return self.empty.wait_then(producer, lambda: self.mutex.wait_then(
+            producer, lambda: self._append(producer, item)))
+
+    def _append(self, producer, item):
         self.buffer.append(item)
         self.history.append(('P', producer.pid, item))
         self.mutex.signal()
@@ -52,13 +107,15 @@ class ProducerConsumer:
         return True
 
     def consume(self, consumer):
-        """Consume un item"""
-        if not self.full.wait(consumer):
-            return False, None
-
-        if not self.mutex.wait(consumer):
-            return False, None
-
+        """
+        Consume un item. Si el buffer está vacío devuelve (False, None) y el
+        consumidor queda bloqueado hasta que se produzca un item.
+        """
+        result = self.full.wait_then(consumer, lambda: self.mutex.wait_then(
+            consumer, lambda: self._take(consumer)))
+        return result or (False, None)
+
+    def _take(self, consumer):
         item = self.buffer.popleft()
         self.history.append(('C', consumer.pid, item))
         self.mutex.signal()
@@ -69,51 +126,57 @@ class ProducerConsumer:
         return {
             'buffer_content': list(self.buffer),
             'buffer_size': len(self.buffer),
+            'blocked': [p.pid for p in self.empty.waiting_queue] +
+                       [p.pid for p in self.full.waiting_queue],
             'history': self.history[-10:]  # Últimas 10 operaciones
         }
 
 class ReadersWriters:
     """Implementación del problema lectores-escritores"""
-    def __init__(self):
-        self.mutex = Semaphore(1)
-        self.write_lock = Semaphore(1)
+    def __init__(self, scheduler=None):
+        continuations = Continuations()
+        self.mutex = Semaphore(1, scheduler, continuations)
+        self.write_lock = Semaphore(1, scheduler, continuations)
         self.readers_count = 0
         self.history = []
 
     def start_read(self, reader):
-        """Inicia una operación de lectura"""
-        if not self.mutex.wait(reader):
-            return False
+        """
+        Inicia una operación de lectura. Si hay un escritor, el lector queda
+        bloqueado y la lectura empieza cuando termine la escritura.
+        """
+        return self.mutex.wait_then(reader, lambda: self._enter_read(reader))
 
+    def _enter_read(self, reader):
         self.readers_count += 1
         if self.readers_count == 1:
-            if not self.write_lock.wait(reader):
-                self.readers_count -= 1
-                self.mutex.signal()
-                return False
+            # El primer lector espera al escritor con el mutex tomado, así
+            # que los siguientes lectores esperan detrás de él
+            return self.write_lock.wait_then(reader, lambda: self._read_started(reader))
+        return self._read_started(reader)
 
+    def _read_started(self, reader):
         self.history.append(('R', reader.pid, 'start'))
         self.mutex.signal()
         return True
 
     def end_read(self, reader):
         """Finaliza una operación de lectura"""
-        if not self.mutex.wait(reader):
-            return False
+        return self.mutex.wait_then(reader, lambda: self._exit_read(reader))
 
+    def _exit_read(self, reader):
         self.readers_count -= 1
+        self.history.append(('R', reader.pid, 'end'))
         if self.readers_count == 0:
             self.write_lock.signal()
-
-        self.history.append(('R', reader.pid, 'end'))
         self.mutex.signal()
         return True
 
     def start_write(self, writer):
-        """Inicia una operación de escritura"""
-        if not self.write_lock.wait(writer):
-            return False
+        """Inicia una operación de escritura (bloquea al escritor si está ocupado)"""
+        return self.write_lock.wait_then(writer, lambda: self._write_started(writer))
 
+    def _write_started(self, writer):
         self.history.append(('W', writer.pid, 'start'))
         return True
 
@@ -127,6 +190,8 @@ class ReadersWriters:
         return {
             'readers_count': self.readers_count,
             'writing': self.write_lock.value == 0,
+            'blocked': [p.pid for p in self.mutex.waiting_queue] +
+                       [p.pid for p in self.write_lock.waiting_queue],
             'history': self.history[-10:]  # Últimas 10 operaciones
         }
 